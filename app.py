@@ -1908,6 +1908,7 @@ def show_api_settings(api_manager, pixel_api):
         if st.button("Update Gemini API Key"):
             if new_gemini_key and not new_gemini_key.endswith("..."):
                 if api_manager.update_api_key('GEMINI_API_KEY', new_gemini_key):
+                    api_manager.compact()
                     st.success("✅ Gemini API key updated successfully!")
                     st.rerun()
                 else:
@@ -1943,6 +1944,7 @@ def show_api_settings(api_manager, pixel_api):
             if st.button(f"Update Bing API Key {i}"):
                 if new_key and not new_key.endswith("..."):
                     if api_manager.update_api_key(f'BING_API_KEY_{i}', new_key):
+                        api_manager.compact()
                         st.success(f"✅ Bing API key {i} updated successfully!")
                         st.rerun()
                     else:
@@ -3,6 +3,9 @@ from typing import Dict, List, Optional
 import re
 import uuid
 
+# Last sentence terminator in a string (start of the match is its index)
+_SENTENCE_END_RE = re.compile(r'[.!?][^.!?]*\Z')
+
 class ArticleManager:
     def __init__(self):
         self.article_categories = [
@@ -15,49 +18,63 @@ class ArticleManager:
                       author: str = "Admin") -> Dict:
         """Create a new article"""
         try:
-            # Generate article ID
-            article_id = str(uuid.uuid4())
-            
-            # Clean and validate input
-            title = title.strip()
-            content = content.strip()
-            category = category if category in self.article_categories else "General"
-            tags = tags or []
-            
-            # Generate article slug
-            slug = self._generate_slug(title)
-            
-            # Calculate reading time
-            reading_time = self._calculate_reading_time(content)
-            
-            # Generate excerpt
-            excerpt = self._generate_excerpt(content)
-            
-            # Create article data
-            article_data = {
-                'id': article_id,
-                'title': title,
-                'slug': slug,
-                'content': content,
-                'excerpt': excerpt,
-                'category': category,
-                'tags': tags,
-                'author': author,
-                'image_url': image_url,
-                'reading_time': reading_time,
-                'word_count': len(content.split()),
-                'status': 'published',
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat(),
-                'views': 0,
-                'likes': 0
-            }
-            
-            return article_data
+            return self._build_article(title, content, category, tags, image_url,
+                                       author, datetime.now().isoformat())
         
         except Exception as e:
             return {'error': f'Failed to create article: {str(e)}'}
     
+    def create_articles_bulk(self, rows: List[Dict]) -> List[Dict]:
+        """Create many articles at once (e.g. CSV/RSS imports)"""
+        # One timestamp for the whole batch
+        now = datetime.now().isoformat()
+        build = self._build_article
+        articles = []
+        
+        for row in rows:
+            try:
+                articles.append(build(
+                    row.get('title', ''),
+                    row.get('content', ''),
+                    row.get('category', 'General'),
+                    row.get('tags'),
+                    row.get('image_url'),
+                    row.get('author', 'Admin'),
+                    now
+                ))
+            except Exception as e:
+                articles.append({'error': f'Failed to create article: {str(e)}'})
+        
+        return articles
+    
+    def _build_article(self, title: str, content: str, category: str, tags: Optional[List[str]],
+                       image_url: Optional[str], author: str, now: str) -> Dict:
+        """Assemble article data with a caller-supplied timestamp"""
+        # Clean and validate input
+        title = title.strip()
+        content = content.strip()
+        category = category if category in self.article_categories else "General"
+        word_count = len(content.split())
+        
+        return {
+            'id': str(uuid.uuid4()),
+            'title': title,
+            'slug': self._generate_slug(title),
+            'content': content,
+            'excerpt': self._generate_excerpt(content),
+            'category': category,
+            'tags': tags or [],
+            'author': author,
+            'image_url': image_url,
+            'reading_time': self._reading_time_from_word_count(word_count),
+            'word_count': word_count,
+            'status': 'published',
+            'created_at': now,
+            'updated_at': now,
+            'views': 0,
+            'likes': 0
+        }
+    
     def _generate_slug(self, title: str) -> str:
         """Generate URL-friendly slug from title"""
         try:
@@ -78,14 +95,12 @@ class ArticleManager:
     
     def _calculate_reading_time(self, content: str) -> int:
         """Calculate estimated reading time in minutes"""
-        try:
-            words = len(content.split())
-            # Average reading speed: 200 words per minute
-            reading_time = max(1, round(words / 200))
-            return reading_time
-        
-        except Exception:
-            return 1
+        return self._reading_time_from_word_count(len(content.split()))
+    
+    def _reading_time_from_word_count(self, word_count: int) -> int:
+        """Reading time in minutes for a known word count"""
+        # Average reading speed: 200 words per minute
+        return max(1, round(word_count / 200))
     
     def _generate_excerpt(self, content: str, length: int = 150) -> str:
         """Generate article excerpt"""
@@ -95,11 +110,8 @@ class ArticleManager:
             
             # Find the last complete sentence within the length limit
             excerpt = content[:length]
-            last_sentence_end = max(
-                excerpt.rfind('.'),
-                excerpt.rfind('!'),
-                excerpt.rfind('?')
-            )
+            match = _SENTENCE_END_RE.search(excerpt)
+            last_sentence_end = match.start() if match else -1
             
             if last_sentence_end > 0:
                 excerpt = excerpt[:last_sentence_end + 1]
@@ -141,9 +153,11 @@ class ArticleManager:
                 article['slug'] = self._generate_slug(updates['title'])
             
             if 'content' in updates:
-                article['excerpt'] = self._generate_excerpt(updates['content'])
-                article['reading_time'] = self._calculate_reading_time(updates['content'])
-                article['word_count'] = len(updates['content'].split())
+                new_content = updates['content']
+                word_count = len(new_content.split())
+                article['excerpt'] = self._generate_excerpt(new_content)
+                article['reading_time'] = self._reading_time_from_word_count(word_count)
+                article['word_count'] = word_count
             
             # Update timestamp
             article['updated_at'] = datetime.now().isoformat()
@@ -153,8 +167,13 @@ class ArticleManager:
         except Exception as e:
             return {'error': f'Failed to update article: {str(e)}'}
     
-    def delete_article(self, article_id: str, articles: List[Dict]) -> Dict:
-        """Delete an article"""
+    def delete_article(self, article_id: str, articles: List[Dict],
+                       order_preserving: bool = True) -> Dict:
+        """Delete an article
+        
+        With order_preserving=False the last article is moved into the freed
+        slot, making removal O(1) at the cost of list order.
+        """
         try:
             # Find and remove the article
             article_index = None
@@ -166,7 +185,12 @@ class ArticleManager:
             if article_index is None:
                 return {'error': 'Article not found'}
             
-            deleted_article = articles.pop(article_index)
+            if order_preserving:
+                deleted_article = articles.pop(article_index)
+            else:
+                deleted_article = articles[article_index]
+                articles[article_index] = articles[-1]
+                articles.pop()
             
             return {
                 'success': True,
@@ -179,19 +203,17 @@ class ArticleManager:
     
     def get_articles_by_category(self, articles: List[Dict], category: str) -> List[Dict]:
         """Get articles filtered by category"""
-        try:
-            return [article for article in articles if article.get('category') == category]
-        
-        except Exception as e:
+        if not articles:
             return []
+        
+        return [article for article in articles if article.get('category') == category]
     
     def get_articles_by_tag(self, articles: List[Dict], tag: str) -> List[Dict]:
         """Get articles filtered by tag"""
-        try:
-            return [article for article in articles if tag in article.get('tags', [])]
-        
-        except Exception as e:
+        if not articles:
             return []
+        
+        return [article for article in articles if tag in article.get('tags', [])]
     
     def search_articles(self, articles: List[Dict], query: str) -> List[Dict]:
         """Search articles by title and content"""
@@ -265,16 +287,17 @@ class ArticleManager:
     def sort_articles(self, articles: List[Dict], sort_by: str = 'created_at', 
                      reverse: bool = True) -> List[Dict]:
         """Sort articles by specified field"""
-        try:
-            valid_sort_fields = ['created_at', 'updated_at', 'title', 'views', 'likes', 'word_count']
-            
-            if sort_by not in valid_sort_fields:
-                sort_by = 'created_at'
-            
-            return sorted(articles, key=lambda x: x.get(sort_by, ''), reverse=reverse)
+        if not articles:
+            return []
         
-        except Exception as e:
-            return articles
+        valid_sort_fields = ['created_at', 'updated_at', 'title', 'views', 'likes', 'word_count']
+        
+        if sort_by not in valid_sort_fields:
+            sort_by = 'created_at'
+        
+        # Bind field and a type-matching default as locals of the key function
+        default = '' if sort_by in ('created_at', 'updated_at', 'title') else 0
+        return sorted(articles, key=lambda x, k=sort_by, d=default: x.get(k, d), reverse=reverse)
     
     def get_related_articles(self, article: Dict, all_articles: List[Dict], 
                            limit: int = 3) -> List[Dict]:
@@ -333,7 +356,8 @@ class ArticleManager:
                 warnings.append(f"Category '{category}' is not in the standard list")
             
             # Check for duplicate content (simple check)
-            if content and len(set(content.split())) / len(content.split()) < 0.3:
+            words = content.split() if content else []
+            if words and len(set(words)) / len(words) < 0.3:
                 warnings.append("Content appears to have many repeated words")
             
             return {
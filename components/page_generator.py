@@ -1,44 +1,129 @@
-from datetime import datetime
-from typing import Dict, List, Optional
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+from jinja2 import Environment, BaseLoader
+from typing import Dict, Iterator, List, Optional
+import html
+import io
 import re
+import sys
+import textwrap
 
-class PageGenerator:
-    def __init__(self):
-        self.page_templates = {
-            'about': self._get_about_template(),
-            'contact': self._get_contact_template(),
-            'privacy': self._get_privacy_template(),
-            'disclaimer': self._get_disclaimer_template(),
-            'terms': self._get_terms_template()
-        }
-    
-    def generate_about_page(self, site_data: Dict) -> str:
-        """Generate About page content"""
-        try:
-            title = site_data.get('title', 'Our Company')
-            description = site_data.get('description', 'Learn more about us')
-            category = site_data.get('category', 'Business')
-            
-            # Extract content from domain data if available
-            domain_content = ""
-            if 'domain_data' in site_data and site_data['domain_data'].get('content'):
-                domain_content = site_data['domain_data']['content'].get('main_text', '')
-            
-            # Generate about content based on category
-            about_content = self._generate_about_content(title, description, category, domain_content)
-            
-            return self._format_page_content('About Us', about_content)
-        
-        except Exception as e:
-            return f"<h1>About Us</h1><p>Error generating about page: {str(e)}</p>"
-    
-    def generate_contact_page(self, site_data: Dict) -> str:
-        """Generate Contact page content"""
-        try:
-            title = site_data.get('title', 'Contact Us')
-            domain = site_data.get('domain', 'example.com')
-            
-            contact_content = f"""
+_SCRIPT_RE = re.compile(r'<script\b', re.IGNORECASE)
+
+# Static page chrome shared by every generated page; only the title and the
+# body content vary, so the page is assembled by joining these around them.
+_HEAD_PREFIX = """
+            <!DOCTYPE html>
+            <html lang="en">
+            <head>
+                <meta charset="UTF-8">
+                <meta name="viewport" content="width=device-width, initial-scale=1.0">
+                <title>"""
+
+# Stylesheet shared by all generated pages, inlined unless a css_url is given
+_PAGE_CSS = """
+                    body {
+                        font-family: Arial, sans-serif;
+                        line-height: 1.6;
+                        color: #333;
+                        max-width: 800px;
+                        margin: 0 auto;
+                        padding: 20px;
+                    }
+                    h1 {
+                        color: #2c3e50;
+                        border-bottom: 2px solid #3498db;
+                        padding-bottom: 10px;
+                    }
+                    h2 {
+                        color: #34495e;
+                        margin-top: 30px;
+                    }
+                    h3 {
+                        color: #5a6c7d;
+                    }
+                    ul {
+                        padding-left: 20px;
+                    }
+                    li {
+                        margin-bottom: 5px;
+                    }
+                    .contact-info, .contact-form, .business-hours {
+                        background-color: #f8f9fa;
+                        padding: 20px;
+                        margin: 20px 0;
+                        border-radius: 5px;
+                    }
+                    .form-group {
+                        margin-bottom: 15px;
+                    }
+                    label {
+                        display: block;
+                        margin-bottom: 5px;
+                        font-weight: bold;
+                    }
+                    input, textarea {
+                        width: 100%;
+                        padding: 8px;
+                        border: 1px solid #ddd;
+                        border-radius: 3px;
+                        font-size: 14px;
+                    }
+                    button {
+                        background-color: #3498db;
+                        color: white;
+                        padding: 10px 20px;
+                        border: none;
+                        border-radius: 3px;
+                        cursor: pointer;
+                        font-size: 16px;
+                    }
+                    button:hover {
+                        background-color: #2980b9;
+                    }
+                """
+
+def _build_head_suffix(head_asset: str) -> str:
+    """Close the title, add the stylesheet element and open the body"""
+    return "".join(("</title>\n                ", head_asset, "\n            </head>\n            <body>\n                "))
+
+_HEAD_SUFFIX_BODY_OPEN = _build_head_suffix("<style>" + _PAGE_CSS + "</style>")
+
+_BODY_CLOSE = """
+            </body>
+            </html>
+            """
+
+# UTF-8 encoded chrome for callers that write bytes straight to a response
+_HEAD_PREFIX_B = _HEAD_PREFIX.encode('utf-8')
+_HEAD_SUFFIX_BODY_OPEN_B = _HEAD_SUFFIX_BODY_OPEN.encode('utf-8')
+_BODY_CLOSE_B = _BODY_CLOSE.encode('utf-8')
+
+def _intern(value):
+    """Intern site-level strings reused across every page of a site"""
+    return sys.intern(value) if type(value) is str else value
+
+@lru_cache(maxsize=256)
+def _lower_category(category: str) -> str:
+    """Lowercased category, memoized since a site's category repeats on every page"""
+    return sys.intern(category.lower())
+
+# Bound once so hot paths do a single global lookup instead of a module attribute chain
+_today = date.today
+
+_MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+           'August', 'September', 'October', 'November', 'December')
+
+@lru_cache(maxsize=2)
+def _today_str(ordinal: int) -> str:
+    """Human-readable date ('%B %d, %Y') for a day ordinal, formatted once per day"""
+    d = date.fromordinal(ordinal)
+    # Built by hand so the English month name does not depend on the locale
+    return f"{_MONTHS[d.month - 1]} {d.day:02d}, {d.year}"
+
+# Static bodies of the standard pages; {name} marks a gap filled per site
+_CONTACT_HTML = """
             <h1>Contact Us</h1>
             <p>We'd love to hear from you! Get in touch with us using the information below.</p>
             
@@ -79,21 +164,10 @@ class PageGenerator:
                 <p><strong>Sunday:</strong> Closed</p>
             </div>
             """
-            
-            return self._format_page_content('Contact Us', contact_content)
-        
-        except Exception as e:
-            return f"<h1>Contact Us</h1><p>Error generating contact page: {str(e)}</p>"
-    
-    def generate_privacy_policy(self, site_data: Dict) -> str:
-        """Generate Privacy Policy page"""
-        try:
-            title = site_data.get('title', 'Our Website')
-            domain = site_data.get('domain', 'example.com')
-            
-            privacy_content = f"""
+
+_PRIVACY_HTML = """
             <h1>Privacy Policy</h1>
-            <p><strong>Effective Date:</strong> {datetime.now().strftime('%B %d, %Y')}</p>
+            <p><strong>Effective Date:</strong> {date}</p>
             
             <p>This Privacy Policy describes how {title} ("we," "us," or "our") collects, uses, and protects your personal information when you visit our website at {domain}.</p>
             
@@ -140,21 +214,10 @@ class PageGenerator:
             <h2>Contact Us</h2>
             <p>If you have any questions about this Privacy Policy, please contact us at info@{domain}.</p>
             """
-            
-            return self._format_page_content('Privacy Policy', privacy_content)
-        
-        except Exception as e:
-            return f"<h1>Privacy Policy</h1><p>Error generating privacy policy: {str(e)}</p>"
-    
-    def generate_disclaimer(self, site_data: Dict) -> str:
-        """Generate Disclaimer page"""
-        try:
-            title = site_data.get('title', 'Our Website')
-            domain = site_data.get('domain', 'example.com')
-            
-            disclaimer_content = f"""
+
+_DISCLAIMER_HTML = """
             <h1>Disclaimer</h1>
-            <p><strong>Last Updated:</strong> {datetime.now().strftime('%B %d, %Y')}</p>
+            <p><strong>Last Updated:</strong> {date}</p>
             
             <h2>Website Disclaimer</h2>
             <p>The information on this website ({domain}) is provided on an "as is" basis. To the fullest extent permitted by law, {title} excludes all representations, warranties, obligations, and liabilities arising out of or in connection with the use of this website.</p>
@@ -180,21 +243,10 @@ class PageGenerator:
             <h2>Contact Information</h2>
             <p>If you have any questions about this disclaimer, please contact us at info@{domain}.</p>
             """
-            
-            return self._format_page_content('Disclaimer', disclaimer_content)
-        
-        except Exception as e:
-            return f"<h1>Disclaimer</h1><p>Error generating disclaimer: {str(e)}</p>"
-    
-    def generate_terms_of_service(self, site_data: Dict) -> str:
-        """Generate Terms of Service page"""
-        try:
-            title = site_data.get('title', 'Our Website')
-            domain = site_data.get('domain', 'example.com')
-            
-            terms_content = f"""
+
+_TERMS_HTML = """
             <h1>Terms of Service</h1>
-            <p><strong>Effective Date:</strong> {datetime.now().strftime('%B %d, %Y')}</p>
+            <p><strong>Effective Date:</strong> {date}</p>
             
             <p>Welcome to {title}. These Terms of Service ("Terms") govern your use of our website located at {domain} (the "Service") operated by {title}.</p>
             
@@ -222,24 +274,9 @@ class PageGenerator:
             <h2>Governing Law</h2>
             <p>These terms and conditions are governed by and construed in accordance with the laws and you irrevocably submit to the exclusive jurisdiction of the courts in that state or location.</p>
             """
-            
-            return self._format_page_content('Terms of Service', terms_content)
-        
-        except Exception as e:
-            return f"<h1>Terms of Service</h1><p>Error generating terms of service: {str(e)}</p>"
-    
-    def _generate_about_content(self, title: str, description: str, category: str, domain_content: str) -> str:
-        """Generate customized about content based on site data"""
-        try:
-            # Base about content
-            about_content = f"""
-            <h1>About {title}</h1>
-            <p>{description}</p>
-            """
-            
-            # Add category-specific content
-            if category.lower() == 'business':
-                about_content += """
+
+# Category-specific sections of the About page
+_BUSINESS_BLOCK = """
                 <h2>Our Mission</h2>
                 <p>We are dedicated to providing exceptional services and solutions that help our clients achieve their goals. Our team of professionals brings years of experience and expertise to every project.</p>
                 
@@ -255,8 +292,8 @@ class PageGenerator:
                     <li>Competitive pricing and value</li>
                 </ul>
                 """
-            elif category.lower() == 'blog':
-                about_content += """
+
+_BLOG_BLOCK = """
                 <h2>Welcome to Our Blog</h2>
                 <p>This blog is dedicated to sharing insights, tips, and stories that matter to our community. We cover a wide range of topics and strive to provide valuable content that informs and inspires.</p>
                 
@@ -266,8 +303,8 @@ class PageGenerator:
                 <h2>Join Our Community</h2>
                 <p>We encourage our readers to engage with our content, share their thoughts, and be part of our growing community. Your feedback and participation help us improve and create better content.</p>
                 """
-            elif category.lower() == 'portfolio':
-                about_content += """
+
+_PORTFOLIO_BLOCK = """
                 <h2>About My Work</h2>
                 <p>This portfolio showcases my skills, experience, and projects. I'm passionate about creating high-quality work that meets client needs and exceeds expectations.</p>
                 
@@ -277,105 +314,15 @@ class PageGenerator:
                 <h2>Let's Work Together</h2>
                 <p>I'm always interested in new opportunities and collaborations. If you have a project in mind or would like to discuss potential partnerships, please don't hesitate to get in touch.</p>
                 """
-            
-            # Add domain-specific content if available
-            if domain_content and len(domain_content) > 100:
-                about_content += f"""
-                <h2>More About Us</h2>
-                <p>{domain_content[:300]}...</p>
-                """
-            
-            return about_content
-        
-        except Exception as e:
-            return f"<h1>About Us</h1><p>Error generating about content: {str(e)}</p>"
-    
-    def _format_page_content(self, title: str, content: str) -> str:
-        """Format page content with consistent styling"""
-        try:
-            formatted_content = f"""
-            <!DOCTYPE html>
-            <html lang="en">
-            <head>
-                <meta charset="UTF-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <title>{title}</title>
-                <style>
-                    body {{
-                        font-family: Arial, sans-serif;
-                        line-height: 1.6;
-                        color: #333;
-                        max-width: 800px;
-                        margin: 0 auto;
-                        padding: 20px;
-                    }}
-                    h1 {{
-                        color: #2c3e50;
-                        border-bottom: 2px solid #3498db;
-                        padding-bottom: 10px;
-                    }}
-                    h2 {{
-                        color: #34495e;
-                        margin-top: 30px;
-                    }}
-                    h3 {{
-                        color: #5a6c7d;
-                    }}
-                    ul {{
-                        padding-left: 20px;
-                    }}
-                    li {{
-                        margin-bottom: 5px;
-                    }}
-                    .contact-info, .contact-form, .business-hours {{
-                        background-color: #f8f9fa;
-                        padding: 20px;
-                        margin: 20px 0;
-                        border-radius: 5px;
-                    }}
-                    .form-group {{
-                        margin-bottom: 15px;
-                    }}
-                    label {{
-                        display: block;
-                        margin-bottom: 5px;
-                        font-weight: bold;
-                    }}
-                    input, textarea {{
-                        width: 100%;
-                        padding: 8px;
-                        border: 1px solid #ddd;
-                        border-radius: 3px;
-                        font-size: 14px;
-                    }}
-                    button {{
-                        background-color: #3498db;
-                        color: white;
-                        padding: 10px 20px;
-                        border: none;
-                        border-radius: 3px;
-                        cursor: pointer;
-                        font-size: 16px;
-                    }}
-                    button:hover {{
-                        background-color: #2980b9;
-                    }}
-                </style>
-            </head>
-            <body>
-                {content}
-            </body>
-            </html>
-            """
-            
-            return formatted_content
-        
-        except Exception as e:
-            return f"<html><body><h1>{title}</h1><p>Error formatting page: {str(e)}</p></body></html>"
-    
-    def _get_about_template(self) -> str:
-        """Get about page template"""
-        return """
+
+_CATEGORY_BLOCKS = {
+    'business': _BUSINESS_BLOCK,
+    'blog': _BLOG_BLOCK,
+    'portfolio': _PORTFOLIO_BLOCK
+}
+
+# Jinja-style sources for the editable page templates
+_ABOUT_JINJA_SRC = """
         <h1>About {{ title }}</h1>
         <p>{{ description }}</p>
         
@@ -392,10 +339,8 @@ class PageGenerator:
             {% endfor %}
         </ul>
         """
-    
-    def _get_contact_template(self) -> str:
-        """Get contact page template"""
-        return """
+
+_CONTACT_JINJA_SRC = """
         <h1>Contact {{ title }}</h1>
         <p>We'd love to hear from you!</p>
         
@@ -406,10 +351,8 @@ class PageGenerator:
             <p><strong>Address:</strong> {{ address }}</p>
         </div>
         """
-    
-    def _get_privacy_template(self) -> str:
-        """Get privacy policy template"""
-        return """
+
+_PRIVACY_JINJA_SRC = """
         <h1>Privacy Policy</h1>
         <p><strong>Effective Date:</strong> {{ effective_date }}</p>
         
@@ -419,41 +362,233 @@ class PageGenerator:
         <h2>How We Use Your Information</h2>
         <p>{{ information_usage }}</p>
         """
-    
-    def _get_disclaimer_template(self) -> str:
-        """Get disclaimer template"""
-        return """
+
+_DISCLAIMER_JINJA_SRC = """
         <h1>Disclaimer</h1>
         <p><strong>Last Updated:</strong> {{ last_updated }}</p>
         
         <h2>Website Disclaimer</h2>
         <p>{{ disclaimer_content }}</p>
         """
-    
-    def _get_terms_template(self) -> str:
-        """Get terms of service template"""
-        return """
+
+_TERMS_JINJA_SRC = """
         <h1>Terms of Service</h1>
         <p><strong>Effective Date:</strong> {{ effective_date }}</p>
         
         <h2>Acceptance of Terms</h2>
         <p>{{ acceptance_terms }}</p>
         """
+
+_TEMPLATE_SOURCES = {
+    'about': _ABOUT_JINJA_SRC,
+    'contact': _CONTACT_JINJA_SRC,
+    'privacy': _PRIVACY_JINJA_SRC,
+    'disclaimer': _DISCLAIMER_JINJA_SRC,
+    'terms': _TERMS_JINJA_SRC
+}
+
+# Compiled once at import; every PageGenerator shares the Template objects
+_JINJA_ENV = Environment(loader=BaseLoader(), auto_reload=False)
+_COMPILED_TEMPLATES = {name: _JINJA_ENV.from_string(src) for name, src in _TEMPLATE_SOURCES.items()}
+
+# A page split into static chunks around its gaps:
+# prefix, value(gap_keys[0]), suffixes[0], value(gap_keys[1]), suffixes[1], ...
+_PageTemplate = namedtuple('_PageTemplate', ['prefix', 'gap_keys', 'suffixes'])
+
+def _split_template(source: str) -> _PageTemplate:
+    """Split a template into static chunks around its {name} gaps"""
+    pieces = re.split(r'\{(\w+)\}', source)
+    return _PageTemplate(pieces[0], tuple(pieces[1::2]), tuple(pieces[2::2]))
+
+def _plug_parts(tpl: _PageTemplate, binding: Dict) -> List[str]:
+    """Interleave the static chunks of a split template with its bindings"""
+    parts = [tpl.prefix]
+    append = parts.append
+    for key, suffix in zip(tpl.gap_keys, tpl.suffixes):
+        append(str(binding[key]))
+        append(suffix)
+    return parts
+
+def _plug(tpl: _PageTemplate, binding: Dict) -> str:
+    """Fill the gaps of a split template from a binding dict"""
+    return "".join(_plug_parts(tpl, binding))
+
+def _encode_template(tpl: _PageTemplate) -> _PageTemplate:
+    """UTF-8 encode the static chunks of a split template"""
+    return _PageTemplate(tpl.prefix.encode('utf-8'), tpl.gap_keys,
+                         tuple(suffix.encode('utf-8') for suffix in tpl.suffixes))
+
+def _iter_plug_bytes(tpl: _PageTemplate, binding: Dict) -> Iterator[bytes]:
+    """Yield the chunks of an encoded split template with its gaps filled"""
+    yield tpl.prefix
+    for key, suffix in zip(tpl.gap_keys, tpl.suffixes):
+        yield str(binding[key]).encode('utf-8')
+        yield suffix
+
+_CONTACT_PAGE = _split_template(_CONTACT_HTML)
+_PRIVACY_PAGE = _split_template(_PRIVACY_HTML)
+_DISCLAIMER_PAGE = _split_template(_DISCLAIMER_HTML)
+_TERMS_PAGE = _split_template(_TERMS_HTML)
+
+_PRIVACY_PAGE_B = _encode_template(_PRIVACY_PAGE)
+
+# Legal pages depend only on (title, domain, date), so their bodies are memoized
+@lru_cache(maxsize=1024)
+def _render_privacy(title: str, domain: str, today: str) -> str:
+    return _plug(_PRIVACY_PAGE, {'title': title, 'domain': domain, 'date': today})
+
+@lru_cache(maxsize=1024)
+def _render_disclaimer(title: str, domain: str, today: str) -> str:
+    return _plug(_DISCLAIMER_PAGE, {'title': title, 'domain': domain, 'date': today})
+
+@lru_cache(maxsize=1024)
+def _render_terms(title: str, domain: str, today: str) -> str:
+    return _plug(_TERMS_PAGE, {'title': title, 'domain': domain, 'date': today})
+
+class PageGenerator:
+    __slots__ = ('page_templates', 'normalize', 'css_url', '_head_suffix', '_head_suffix_b')
+    
+    def __init__(self, normalize: bool = False, css_url: Optional[str] = None):
+        """With normalize=True, categories are lowercased once through a memoized
+        lookup so later page generations skip the per-call .lower(); the
+        caller's site_data is never modified.
+        With css_url set, pages link to that stylesheet (see get_css()) instead
+        of inlining it."""
+        self.page_templates = dict(_COMPILED_TEMPLATES)
+        self.normalize = normalize
+        self.css_url = css_url
+        
+        if css_url:
+            self._head_suffix = _build_head_suffix(f'<link rel="stylesheet" href="{html.escape(css_url)}">')
+            self._head_suffix_b = self._head_suffix.encode('utf-8')
+        else:
+            self._head_suffix = _HEAD_SUFFIX_BODY_OPEN
+            self._head_suffix_b = _HEAD_SUFFIX_BODY_OPEN_B
+    
+    def generate_about_page(self, site_data: Dict) -> str:
+        """Generate About page content"""
+        title = _intern(site_data.get('title', 'Our Company'))
+        description = site_data.get('description', 'Learn more about us')
+        category = _intern(site_data.get('category', 'Business'))
+        if self.normalize:
+            category = _lower_category(category)
+        
+        # Extract content from domain data if available
+        domain_content = ((site_data.get('domain_data') or {}).get('content') or {}).get('main_text', '')
+        
+        # Generate about content based on category
+        about_content = self._generate_about_content(title, description, category, domain_content)
+        
+        return self._format_page_content('About Us', about_content)
+    
+    def generate_contact_page(self, site_data: Dict) -> str:
+        """Generate Contact page content"""
+        title = _intern(site_data.get('title', 'Contact Us'))
+        domain = _intern(site_data.get('domain', 'example.com'))
+        
+        contact_parts = _plug_parts(_CONTACT_PAGE, {'domain': domain})
+        
+        return self._format_page_content_parts('Contact Us', contact_parts)
+    
+    def generate_privacy_policy(self, site_data: Dict) -> str:
+        """Generate Privacy Policy page"""
+        title = _intern(site_data.get('title', 'Our Website'))
+        domain = _intern(site_data.get('domain', 'example.com'))
+        
+        privacy_content = _render_privacy(title, domain, _today_str(_today().toordinal()))
+        
+        return self._format_page_content('Privacy Policy', privacy_content)
+    
+    def generate_privacy_policy_bytes(self, site_data: Dict) -> bytes:
+        """Generate Privacy Policy page as UTF-8 bytes"""
+        title = _intern(site_data.get('title', 'Our Website'))
+        domain = _intern(site_data.get('domain', 'example.com'))
+        
+        privacy_content = _render_privacy(title, domain, _today_str(_today().toordinal()))
+        
+        return self._format_page_bytes('Privacy Policy', privacy_content)
+    
+    def iter_privacy_policy(self, site_data: Dict) -> Iterator[bytes]:
+        """Stream the Privacy Policy page as UTF-8 chunks without building the whole page"""
+        yield _HEAD_PREFIX_B
+        yield b'Privacy Policy'
+        yield self._head_suffix_b
+        yield from _iter_plug_bytes(_PRIVACY_PAGE_B, {
+            'title': _intern(site_data.get('title', 'Our Website')),
+            'domain': _intern(site_data.get('domain', 'example.com')),
+            'date': _today_str(_today().toordinal())
+        })
+        yield _BODY_CLOSE_B
+    
+    def generate_disclaimer(self, site_data: Dict) -> str:
+        """Generate Disclaimer page"""
+        title = _intern(site_data.get('title', 'Our Website'))
+        domain = _intern(site_data.get('domain', 'example.com'))
+        
+        disclaimer_content = _render_disclaimer(title, domain, _today_str(_today().toordinal()))
+        
+        return self._format_page_content('Disclaimer', disclaimer_content)
+    
+    def generate_terms_of_service(self, site_data: Dict) -> str:
+        """Generate Terms of Service page"""
+        title = _intern(site_data.get('title', 'Our Website'))
+        domain = _intern(site_data.get('domain', 'example.com'))
+        
+        terms_content = _render_terms(title, domain, _today_str(_today().toordinal()))
+        
+        return self._format_page_content('Terms of Service', terms_content)
+    
+    def _generate_about_content(self, title: str, description: str, category: str, domain_content: str) -> str:
+        """Generate customized about content based on site data"""
+        buf = io.StringIO()
+        
+        # Base about content
+        buf.write(f"""
+            <h1>About {title}</h1>
+            <p>{description}</p>
+            """)
+        
+        # Add category-specific content (already lowercased when normalizing)
+        cat = category if self.normalize else category.lower()
+        buf.write(_CATEGORY_BLOCKS.get(cat, ''))
+        
+        # Add domain-specific content if available
+        if domain_content and len(domain_content) > 100:
+            buf.write(f"""
+                <h2>More About Us</h2>
+                <p>{domain_content[:300]}...</p>
+                """)
+        
+        return buf.getvalue()
+    
+    def _format_page_content(self, title: str, content: str) -> str:
+        """Format page content with consistent styling"""
+        return "".join((_HEAD_PREFIX, title, self._head_suffix, content, _BODY_CLOSE))
+    
+    def _format_page_content_parts(self, title: str, inner_parts: List[str]) -> str:
+        """Format page content given as parts, joining everything in one pass"""
+        return "".join([_HEAD_PREFIX, title, self._head_suffix, *inner_parts, _BODY_CLOSE])
+    
+    def _format_page_bytes(self, title: str, content: str) -> bytes:
+        """Format page content as UTF-8 bytes; only the dynamic parts are encoded"""
+        return b"".join((_HEAD_PREFIX_B, title.encode('utf-8'), self._head_suffix_b,
+                         content.encode('utf-8'), _BODY_CLOSE_B))
     
     def generate_custom_page(self, page_name: str, content: str, site_data: Dict) -> str:
         """Generate a custom page with given content"""
-        try:
-            page_title = page_name.replace('_', ' ').title()
-            
-            custom_content = f"""
-            <h1>{page_title}</h1>
-            {content}
-            """
-            
-            return self._format_page_content(page_title, custom_content)
+        page_title = page_name.replace('_', ' ').title()
         
-        except Exception as e:
-            return f"<h1>{page_name}</h1><p>Error generating custom page: {str(e)}</p>"
+        custom_parts = ["\n            <h1>", page_title, "</h1>\n            ", content, "\n            "]
+        
+        return self._format_page_content_parts(page_title, custom_parts)
+    
+    def get_css(self) -> str:
+        """Stylesheet for generated pages, to be served at css_url"""
+        return textwrap.dedent(_PAGE_CSS).strip() + "\n"
+    
+    def render(self, name: str, **context) -> str:
+        """Render one of the page templates with the given context"""
+        return self.page_templates[name].render(**context)
     
     def get_page_list(self) -> List[str]:
         """Get list of available page types"""
@@ -461,29 +596,27 @@ class PageGenerator:
     
     def validate_page_content(self, content: str) -> Dict:
         """Validate page content"""
-        try:
-            errors = []
-            warnings = []
-            
-            if not content or len(content.strip()) < 10:
-                errors.append("Page content must be at least 10 characters long")
-            
-            if len(content) > 50000:
-                warnings.append("Page content is very long (over 50,000 characters)")
-            
-            # Check for potential HTML issues
-            if '<script>' in content.lower():
-                warnings.append("Page contains script tags - ensure content is safe")
-            
-            return {
-                'valid': len(errors) == 0,
-                'errors': errors,
-                'warnings': warnings
-            }
-        
-        except Exception as e:
-            return {
-                'valid': False,
-                'errors': [f'Validation error: {str(e)}'],
-                'warnings': []
-            }
+        errors = []
+        warnings = []
+        
+        length = len(content) if content else 0
+        # Only strip (and copy) when there is surrounding whitespace to remove
+        if length and (content[0].isspace() or content[-1].isspace()):
+            length = len(content.strip())
+        
+        if length < 10:
+            errors.append("Page content must be at least 10 characters long")
+        
+        if content and len(content) > 50000:
+            warnings.append("Page content is very long (over 50,000 characters)")
+        
+        # Check for potential HTML issues
+        if content and _SCRIPT_RE.search(content):
+            warnings.append("Page contains script tags - ensure content is safe")
+        
+        return {
+            'valid': len(errors) == 0,
+            'errors': errors,
+            'warnings': warnings
+        }
+    
\ No newline at end of file
@@ -1,10 +1,58 @@
-from datetime import datetime
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import copy
+import hashlib
+import json
+import os
 import re
+import time
 from utils.template_engine import TemplateEngine
 from utils.seo_optimizer import SEOOptimizer
+from utils.timestamps import now_iso
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_SITE_ID_RE = re.compile(r'[^a-zA-Z0-9]')
+
+# Sections of a domain analysis that site creation reads
+_DOMAIN_DATA_KEYS = ('content', 'metadata', 'structure')
+
+# Settings every new site starts with; each site gets its own copy
+_DEFAULT_SITE_SETTINGS = {
+    'responsive': True,
+    'seo_enabled': True,
+    'feed_enabled': True,
+    'analytics_enabled': True
+}
+
+# Extraction results keyed by a digest of the analyzed text, most recent last
+_EXTRACT_CACHE = OrderedDict()
+_EXTRACT_CACHE_SIZE = 256
+
+
+def _iter_sentences(text: str):
+    """Yield the same pieces as text.split('.') without building the list,
+    so callers that stop early never touch the rest of a large text"""
+    find = text.find
+    start = 0
+    while True:
+        end = find('.', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
 
 class SiteBuilder:
+    # Sentences mentioning any of these (as substrings) become feature points
+    _FEATURE_RE = re.compile(
+        r'service|solution|offer|provide|feature|benefit|advantage|quality|expertise|experience',
+        re.IGNORECASE
+    )
+    
     def __init__(self):
         self.template_engine = TemplateEngine()
         self.seo_optimizer = SEOOptimizer()
@@ -14,48 +62,129 @@ class SiteBuilder:
                    domain_data: Dict = None) -> Dict:
         """Create a new website with the given parameters"""
         try:
-            # Generate site ID
-            site_id = self._generate_site_id(domain)
-            
-            # Process domain data if available
-            processed_domain_data = self._process_domain_data(domain_data) if domain_data else {}
-            
-            # Create site structure
-            site_data = {
-                'id': site_id,
-                'domain': domain,
-                'title': title,
-                'description': description,
-                'template': template,
-                'category': category,
-                'status': 'active',
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat(),
-                'domain_data': processed_domain_data,
-                'settings': {
-                    'responsive': True,
-                    'seo_enabled': True,
-                    'feed_enabled': True,
-                    'analytics_enabled': True
-                }
-            }
-            
-            # Generate initial content based on domain analysis
-            if domain_data and domain_data.get('content'):
-                site_data['auto_generated_content'] = self._generate_content_from_domain(domain_data)
-            
-            return site_data
+            return self._build_site(domain, title, description, template, category, domain_data, now_iso())
         
         except Exception as e:
             return {'error': f'Failed to create site: {str(e)}'}
     
+    def create_sites_bulk(self, rows: List[Dict]) -> List[Dict]:
+        """Create many websites at once (e.g. migrating a list of domains)"""
+        # One timestamp for the whole batch
+        now = now_iso()
+        build = self._build_site
+        sites = []
+        
+        for row in rows:
+            try:
+                sites.append(build(
+                    row['domain'],
+                    row.get('title', ''),
+                    row.get('description', ''),
+                    row.get('template', 'default'),
+                    row.get('category', 'Blog'),
+                    row.get('domain_data'),
+                    now
+                ))
+            except Exception as e:
+                sites.append({'error': f'Failed to create site: {str(e)}'})
+        
+        return sites
+    
+    def _build_site(self, domain: str, title: str, description: str, template: str,
+                    category: str, domain_data: Optional[Dict], now: str) -> Dict:
+        """Assemble site data with a caller-supplied timestamp"""
+        # Generate site ID
+        site_id = self._generate_site_id(domain)
+        
+        # Process domain data if available
+        processed_domain_data = self._process_domain_data(domain_data) if domain_data else {}
+        
+        # Create site structure
+        site_data = {
+            'id': site_id,
+            'domain': domain,
+            'title': title,
+            'description': description,
+            'template': template,
+            'category': category,
+            'status': 'active',
+            'created_at': now,
+            'updated_at': now,
+            'domain_data': processed_domain_data,
+            'settings': dict(_DEFAULT_SITE_SETTINGS)
+        }
+        
+        # Generate initial content based on domain analysis
+        if domain_data and domain_data.get('content'):
+            site_data['auto_generated_content'] = self._generate_content_from_domain(domain_data)
+        
+        return site_data
+    
+    def create_site_with_preview(self, domain: str, title: str, description: str,
+                                 template: str = "default", category: str = "Blog",
+                                 domain_data: Dict = None) -> Tuple[Dict, str]:
+        """Create a new website and render its preview in one step
+        
+        Same result as create_site followed by generate_preview, but the new
+        site's fields go straight to the template instead of being copied
+        back out of site_data.
+        """
+        site_data = self.create_site(domain, title, description, template, category, domain_data)
+        if 'error' in site_data:
+            return site_data, self.generate_preview(domain, site_data)
+        
+        try:
+            html_content = self.template_engine.render_template(
+                template,
+                title=title,
+                description=description,
+                category=category,
+                template=template,
+                domain_data=site_data['domain_data'],
+                seo_data={},
+                articles=[],
+                **site_data.get('auto_generated_content', {})
+            )
+        except Exception as e:
+            html_content = f"<html><body><h1>Error generating preview</h1><p>{str(e)}</p></body></html>"
+        
+        return site_data, html_content
+    
     def _generate_site_id(self, domain: str) -> str:
         """Generate a unique site ID from domain"""
         # Clean domain and create ID
-        clean_domain = re.sub(r'[^a-zA-Z0-9]', '', domain.lower())
-        timestamp = int(datetime.now().timestamp())
+        clean_domain = _SITE_ID_RE.sub('', domain.lower())
+        timestamp = time.time_ns() // 1_000_000_000
         return f"{clean_domain}_{timestamp}"
     
+    def load_domain_data(self, source) -> Dict:
+        """Load a saved domain analysis from a path or binary file object
+        
+        Only the sections site creation reads are kept. With ijson installed the
+        file is streamed and values are built only under those top-level keys;
+        the other sections are parsed past without being materialized.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return self.load_domain_data(f)
+        
+        if ijson is not None:
+            builders = {}
+            builder = None
+            for prefix, event, value in ijson.parse(source, use_float=True):
+                if not prefix:
+                    # Root object events; a map_key selects which section follows
+                    if event == 'map_key':
+                        builder = None
+                        if value in _DOMAIN_DATA_KEYS:
+                            builder = builders[value] = ijson.common.ObjectBuilder()
+                elif builder is not None:
+                    builder.event(event, value)
+            return {key: builder.value for key, builder in builders.items()}
+        
+        data = json.load(source)
+        return {key: data[key] for key in _DOMAIN_DATA_KEYS if key in data}
+    
     def _process_domain_data(self, domain_data: Dict) -> Dict:
         """Process and clean domain analysis data"""
         try:
@@ -103,18 +232,8 @@ class SiteBuilder:
             if 'content' in domain_data and domain_data['content'].get('main_text'):
                 main_text = domain_data['content']['main_text']
                 
-                # Generate hero section content
-                content['hero'] = {
-                    'title': self._extract_title_from_text(main_text),
-                    'subtitle': self._extract_subtitle_from_text(main_text),
-                    'description': self._extract_description_from_text(main_text)
-                }
-                
-                # Generate feature points
-                content['features'] = self._extract_features_from_text(main_text)
-                
-                # Generate about content
-                content['about'] = self._generate_about_content(main_text)
+                # Hero section, feature points and about content in one pass
+                content.update(self._extract_all_cached(main_text))
             
             # Extract metadata-based content
             if 'metadata' in domain_data:
@@ -131,11 +250,104 @@ class SiteBuilder:
         except Exception as e:
             return {'error': f'Failed to generate content: {str(e)}'}
     
+    def _extract_all_cached(self, text: str) -> Dict:
+        """_extract_all memoized on a digest of the text, so re-analyzing the same
+        domain content (previews, metadata updates) skips the extraction"""
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        result = _EXTRACT_CACHE.get(key)
+        if result is None:
+            result = self._extract_all(text)
+            _EXTRACT_CACHE[key] = result
+            if len(_EXTRACT_CACHE) > _EXTRACT_CACHE_SIZE:
+                _EXTRACT_CACHE.popitem(last=False)
+        else:
+            _EXTRACT_CACHE.move_to_end(key)
+        
+        # Each site gets its own copy since site data is edited in place
+        return copy.deepcopy(result)
+    
+    def _extract_all(self, text: str) -> Dict:
+        """Extract hero, features and about content with a single walk of the text
+        
+        Produces the same results as the individual _extract_* helpers.
+        """
+        try:
+            words = text.split()
+            word_total = len(words)
+            title = None
+            subtitle = None
+            features = []
+            
+            for i, sentence in enumerate(_iter_sentences(text)):
+                if i > 3 and len(features) >= 3:
+                    break
+                
+                sentence = sentence.strip()
+                length = len(sentence)
+                
+                # Title: first of sentences 1-3 with a usable length
+                if title is None and i < 3 and 10 < length < 60:
+                    title = sentence
+                
+                # Subtitle: first of sentences 2-4 with a usable length
+                if subtitle is None and 1 <= i <= 3 and 20 < length < 100:
+                    subtitle = sentence
+                
+                # Features: sentences mentioning a feature keyword
+                if len(features) < 3 and 15 < length < 100 and self._FEATURE_RE.search(sentence):
+                    features.append({
+                        'title': sentence[:30] + '...' if length > 30 else sentence,
+                        'description': sentence
+                    })
+            
+            if title is None:
+                title = text[:50].strip() + '...' if len(text) > 50 else text.strip()
+            
+            if subtitle is None:
+                subtitle = ' '.join(words[10:25]) if word_total > 20 else "Discover what we have to offer"
+            
+            if word_total > 30:
+                start_idx = min(20, word_total // 4)
+                end_idx = min(start_idx + 30, word_total)
+                description = ' '.join(words[start_idx:end_idx])
+            else:
+                description = text[:150] + '...' if len(text) > 150 else text
+            
+            if not features:
+                features = [
+                    {'title': 'Quality Service', 'description': 'We deliver high-quality services tailored to your needs.'},
+                    {'title': 'Expert Team', 'description': 'Our experienced team brings expertise to every project.'},
+                    {'title': 'Customer Focus', 'description': 'We prioritize customer satisfaction in everything we do.'}
+                ]
+            
+            about = ' '.join(words[:50]) + '...' if word_total > 50 else text
+            
+            return {
+                'hero': {
+                    'title': title,
+                    'subtitle': subtitle,
+                    'description': description
+                },
+                'features': features,
+                'about': about
+            }
+        
+        except Exception:
+            return {
+                'hero': {
+                    'title': self._extract_title_from_text(text),
+                    'subtitle': self._extract_subtitle_from_text(text),
+                    'description': self._extract_description_from_text(text)
+                },
+                'features': self._extract_features_from_text(text),
+                'about': self._generate_about_content(text)
+            }
+    
     def _extract_title_from_text(self, text: str) -> str:
         """Extract a suitable title from text"""
         try:
-            # Split text into sentences and find the first meaningful one
-            sentences = text.split('.')
+            # Split off the first 3 sentences and find the first meaningful one
+            sentences = text.split('.', 3)
             for sentence in sentences[:3]:  # Check first 3 sentences
                 sentence = sentence.strip()
                 if len(sentence) > 10 and len(sentence) < 60:
@@ -151,7 +363,7 @@ class SiteBuilder:
         """Extract a suitable subtitle from text"""
         try:
             # Look for the second meaningful sentence
-            sentences = text.split('.')
+            sentences = text.split('.', 4)
             for i, sentence in enumerate(sentences[1:4]):  # Check sentences 2-4
                 sentence = sentence.strip()
                 if len(sentence) > 20 and len(sentence) < 100:
@@ -188,15 +400,10 @@ class SiteBuilder:
             features = []
             
             # Look for common feature keywords
-            feature_keywords = [
-                'service', 'solution', 'offer', 'provide', 'feature',
-                'benefit', 'advantage', 'quality', 'expertise', 'experience'
-            ]
-            
             sentences = text.split('.')
             for sentence in sentences:
                 sentence = sentence.strip()
-                if any(keyword in sentence.lower() for keyword in feature_keywords):
+                if self._FEATURE_RE.search(sentence):
                     if len(sentence) > 15 and len(sentence) < 100:
                         features.append({
                             'title': sentence[:30] + '...' if len(sentence) > 30 else sentence,
@@ -301,7 +508,7 @@ class SiteBuilder:
                     site_data[key] = value
             
             # Update timestamp
-            site_data['updated_at'] = datetime.now().isoformat()
+            site_data['updated_at'] = now_iso()
             
             # Regenerate SEO data if title or description changed
             if 'title' in updates or 'description' in updates:
@@ -323,7 +530,7 @@ class SiteBuilder:
             return {
                 'success': True,
                 'message': f'Site {domain} has been deleted',
-                'deleted_at': datetime.now().isoformat()
+                'deleted_at': now_iso()
             }
         
         except Exception as e:
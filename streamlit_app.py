@@ -6,7 +6,6 @@ This file serves as the main entry point for streamlit.app deployment.
 """
 
 import streamlit as st
-import sys
 import traceback
 
 def main():
@@ -25,8 +24,5 @@ def main():
             st.code(traceback.format_exc())
         st.stop()
 
-if __name__ == "__main__":
-    main()
-else:
-    # For streamlit.app deployment
-    main()
\ No newline at end of file
+# Streamlit runs this file as a script; run the app exactly once either way
+main()
@@ -1,88 +1,276 @@
 import os
 import json
-from typing import Dict, List, Optional
-from datetime import datetime
+import re
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+from utils.timestamps import now_iso
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Config (de)serialization: orjson when installed, stdlib json otherwise.
+# Both write the same compact UTF-8 layout; configs are only read by the app.
+if orjson is not None:
+    _loads = orjson.loads
+    
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+else:
+    _loads = json.loads
+    
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+_CONFIG_SUFFIX = '_adsense.json'
+_ADS_TXT_INDEX = '.ads_txt_index.json'
+
+# ID formats, matched against the whole string
+_UNIT_RE = re.compile(r'[0-9]{10,}')
+_PUB_RE = re.compile(r'ca-pub-[0-9]{10,}')
+
+# (width, height) for the sizes offered in get_widget_positions
+_SIZE_MAP = {
+    '728x90': ('728', '90'),
+    '300x250': ('300', '250'),
+    '970x90': ('970', '90'),
+    '320x50': ('320', '50'),
+    '336x280': ('336', '280'),
+    '300x600': ('300', '600'),
+}
+
+_AD_TEMPLATE = """
+<!-- %s Ad -->
+<script async src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js"></script>
+<ins class="adsbygoogle"
+     style="display:inline-block;width:%spx;height:%spx"
+     data-ad-client="ca-pub-XXXXXX"
+     data-ad-slot="%s"></ins>
+<script>
+     (adsbygoogle = window.adsbygoogle || []).push({});
+</script>
+"""
+
+_AUTO_ADS_TEMPLATE = """
+<!-- Auto Ads -->
+<script async src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js?client=%s"
+     crossorigin="anonymous"></script>
+"""
+
+# Layout of a new domain config; _default_config hands out fresh copies
+_DEFAULT_CFG_TEMPLATE = {
+    "domain": "",
+    "adsense_enabled": False,
+    "publisher_id": "",
+    "widgets": {
+        "header_banner": {
+            "enabled": False,
+            "ad_unit_id": "",
+            "size": "728x90",
+            "code": ""
+        },
+        "sidebar_rectangle": {
+            "enabled": False,
+            "ad_unit_id": "",
+            "size": "300x250",
+            "code": ""
+        },
+        "content_banner": {
+            "enabled": False,
+            "ad_unit_id": "",
+            "size": "728x90",
+            "code": ""
+        },
+        "mobile_banner": {
+            "enabled": False,
+            "ad_unit_id": "",
+            "size": "320x50",
+            "code": ""
+        },
+        "article_inline": {
+            "enabled": False,
+            "ad_unit_id": "",
+            "size": "728x90",
+            "code": ""
+        },
+        "footer_banner": {
+            "enabled": False,
+            "ad_unit_id": "",
+            "size": "728x90",
+            "code": ""
+        }
+    },
+    "auto_ads": {
+        "enabled": False,
+        "code": ""
+    },
+    "ads_txt_entries": [],
+    "created_at": "",
+    "updated_at": ""
+}
+
+def _default_config(domain: str) -> Dict:
+    """Default AdSense config for a domain, copied level by level from the
+    template (several times cheaper than copy.deepcopy for this fixed layout)"""
+    template = _DEFAULT_CFG_TEMPLATE
+    now = now_iso()
+    return dict(
+        template,
+        domain=domain,
+        widgets={name: dict(widget) for name, widget in template["widgets"].items()},
+        auto_ads=dict(template["auto_ads"]),
+        ads_txt_entries=[],
+        created_at=now,
+        updated_at=now
+    )
+
+def _copy_config(config: Dict) -> Dict:
+    """Copy of a cached config that callers may edit, copied level by level like
+    _default_config: the top-level dicts and lists and each widget dict are new"""
+    copy = {}
+    for key, value in config.items():
+        if isinstance(value, dict):
+            value = {k: dict(v) if isinstance(v, dict) else v for k, v in value.items()}
+        elif isinstance(value, list):
+            value = list(value)
+        copy[key] = value
+    return copy
+
+# Column view of a config's widgets: one tuple per field, aligned by position
+_WidgetTable = namedtuple('_WidgetTable', ['ids', 'enabled', 'ad_unit_id', 'size', 'code'])
+
+def _widget_table(widgets: Dict) -> _WidgetTable:
+    """Transpose the nested widget dicts into columns in a single pass.
+    Configs keep the nested layout on disk and in memory since the UI edits
+    widgets in place; the table is built once per config load and cached
+    next to the config."""
+    rows = [
+        (widget_id, bool(widget.get('enabled', False)), widget.get('ad_unit_id', ''),
+         widget.get('size', '728x90'), widget.get('code', ''))
+        for widget_id, widget in widgets.items()
+    ]
+    if not rows:
+        return _WidgetTable((), (), (), (), ())
+    return _WidgetTable(*zip(*rows))
 
 class AdSenseManager:
     def __init__(self):
         self.ads_folder = "domain_configs"
         self.global_ads_txt = "ads.txt"
+        # Config file path for a domain: self._cfg_path_fmt % domain
+        self._cfg_path_fmt = os.path.join(self.ads_folder.replace('%', '%%'), '%s' + _CONFIG_SUFFIX)
+        # Per-file ads.txt entries persisted across sessions
+        self._ads_txt_index = os.path.join(self.ads_folder, _ADS_TXT_INDEX)
+        
+        # Parsed configs keyed by file path: (file signature, config, widget table);
+        # shared internally, so only copies leave get_domain_adsense_config
+        self._config_cache: Dict[str, tuple] = {}
+        # File signatures ads.txt was last generated from
+        self._ads_txt_sources: Optional[frozenset] = None
+        self._ads_txt_count = 0
+        # ads.txt entries per config file: path -> (file signature, entries)
+        self._ads_txt_entries: Dict[str, tuple] = {}
+        # Rendered ad export per domain: domain -> (settings key, html)
+        self._export_cache: Dict[str, tuple] = {}
         
         # Ensure folder exists
         if not os.path.exists(self.ads_folder):
             os.makedirs(self.ads_folder)
+        
+        self._load_ads_txt_index()
+    
+    def _load_ads_txt_index(self):
+        """Seed the ads.txt entry cache from the index written with the last ads.txt,
+        so a new session only re-reads configs that changed since then"""
+        try:
+            with open(self._ads_txt_index, 'rb', buffering=0) as f:
+                index = _loads(f.read())
+            entries = {
+                path: ((mtime_ns, size), frozenset(domain_entries))
+                for path, (mtime_ns, size, domain_entries) in index.items()
+            }
+        except Exception:
+            return
+        
+        self._ads_txt_entries = entries
+        self._ads_txt_sources = frozenset((path, signature) for path, (signature, _) in entries.items())
+        self._ads_txt_count = len(set().union(*(e for _, e in entries.values())))
+    
+    def _save_ads_txt_index(self):
+        """Persist the per-file ads.txt entries ads.txt was just generated from"""
+        index = {
+            path: [signature[0], signature[1], sorted(entries)]
+            for path, (signature, entries) in self._ads_txt_entries.items()
+        }
+        with open(self._ads_txt_index, 'wb') as f:
+            f.write(_dumps(index))
+    
+    def _file_signature(self, path: str) -> Optional[tuple]:
+        """Modification signature of a file, or None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _iter_config_files(self):
+        """Yield (domain, path, signature) for every domain config file"""
+        with os.scandir(self.ads_folder) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(_CONFIG_SUFFIX):
+                    continue
+                stat = entry.stat()
+                yield name[:-len(_CONFIG_SUFFIX)], entry.path, (stat.st_mtime_ns, stat.st_size)
     
     def get_domain_adsense_config(self, domain: str) -> Dict:
         """Get AdSense configuration for a domain"""
-        config_file = os.path.join(self.ads_folder, f"{domain}_adsense.json")
-        
-        if os.path.exists(config_file):
+        return _copy_config(self._domain_config(domain)[0])
+    
+    def _domain_config(self, domain: str) -> Tuple[Dict, _WidgetTable]:
+        """(config, widget table) for a domain as cached; callers must not modify them"""
+        config_file = self._cfg_path_fmt % domain
+        return self._load_config(domain, config_file, self._file_signature(config_file))
+    
+    def _load_config(self, domain: str, config_file: str,
+                     signature: Optional[tuple]) -> Tuple[Dict, _WidgetTable]:
+        """Load a domain config whose file signature is already known, with its
+        widget table. Both are the cached objects; callers must not modify them."""
+        if signature is not None:
+            cached = self._config_cache.get(config_file)
+            if cached and cached[0] == signature:
+                return cached[1], cached[2]
+            
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                # Whole-file read straight from the raw file; orjson parses the bytes directly
+                with open(config_file, 'rb', buffering=0) as f:
+                    config = _loads(f.read())
+                table = _widget_table(config.get('widgets', {}))
+                self._config_cache[config_file] = (signature, config, table)
+                return config, table
             except:
                 pass
         
         # Return default configuration
-        return {
-            "domain": domain,
-            "adsense_enabled": False,
-            "publisher_id": "",
-            "widgets": {
-                "header_banner": {
-                    "enabled": False,
-                    "ad_unit_id": "",
-                    "size": "728x90",
-                    "code": ""
-                },
-                "sidebar_rectangle": {
-                    "enabled": False,
-                    "ad_unit_id": "",
-                    "size": "300x250",
-                    "code": ""
-                },
-                "content_banner": {
-                    "enabled": False,
-                    "ad_unit_id": "",
-                    "size": "728x90",
-                    "code": ""
-                },
-                "mobile_banner": {
-                    "enabled": False,
-                    "ad_unit_id": "",
-                    "size": "320x50",
-                    "code": ""
-                },
-                "article_inline": {
-                    "enabled": False,
-                    "ad_unit_id": "",
-                    "size": "728x90",
-                    "code": ""
-                },
-                "footer_banner": {
-                    "enabled": False,
-                    "ad_unit_id": "",
-                    "size": "728x90",
-                    "code": ""
-                }
-            },
-            "auto_ads": {
-                "enabled": False,
-                "code": ""
-            },
-            "ads_txt_entries": [],
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        }
+        config = _default_config(domain)
+        return config, _widget_table(config['widgets'])
     
     def save_domain_adsense_config(self, domain: str, config: Dict) -> Dict:
         """Save AdSense configuration for a domain"""
         try:
-            config["updated_at"] = datetime.now().isoformat()
-            config_file = os.path.join(self.ads_folder, f"{domain}_adsense.json")
+            config["updated_at"] = now_iso()
+            config_file = self._cfg_path_fmt % domain
             
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            with open(config_file, 'wb') as f:
+                f.write(_dumps(config))
+            
+            # Keep the caches in step with what was just written; the caller keeps its own dict
+            stored = _copy_config(config)
+            self._config_cache[config_file] = (
+                self._file_signature(config_file), stored, _widget_table(stored.get('widgets', {}))
+            )
+            self._export_cache.pop(domain, None)
             
             # Update global ads.txt
             self.update_global_ads_txt()
@@ -103,30 +291,16 @@ class AdSenseManager:
         if not ad_unit_id:
             return ""
         
-        width, height = size.split('x')
+        width, height = _SIZE_MAP.get(size) or size.split('x')
         
-        return f"""
-<!-- {widget_type.replace('_', ' ').title()} Ad -->
-<script async src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js"></script>
-<ins class="adsbygoogle"
-     style="display:inline-block;width:{width}px;height:{height}px"
-     data-ad-client="ca-pub-XXXXXX"
-     data-ad-slot="{ad_unit_id}"></ins>
-<script>
-     (adsbygoogle = window.adsbygoogle || []).push({{}});
-</script>
-"""
+        return _AD_TEMPLATE % (widget_type.replace('_', ' ').title(), width, height, ad_unit_id)
     
     def generate_auto_ads_code(self, publisher_id: str) -> str:
         """Generate Auto Ads code"""
         if not publisher_id:
             return ""
         
-        return f"""
-<!-- Auto Ads -->
-<script async src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js?client={publisher_id}"
-     crossorigin="anonymous"></script>
-"""
+        return _AUTO_ADS_TEMPLATE % (publisher_id,)
     
     def get_widget_positions(self) -> List[Dict]:
         """Get available widget positions"""
@@ -178,25 +352,47 @@ class AdSenseManager:
     def update_global_ads_txt(self) -> Dict:
         """Update global ads.txt file with all domain entries"""
         try:
-            all_entries = set()
+            config_files = list(self._iter_config_files())
+            sources = frozenset((path, signature) for _, path, signature in config_files)
             
-            # Collect ads.txt entries from all domains
-            for filename in os.listdir(self.ads_folder):
-                if filename.endswith('_adsense.json'):
-                    domain = filename.replace('_adsense.json', '')
-                    config = self.get_domain_adsense_config(domain)
-                    
-                    for entry in config.get('ads_txt_entries', []):
-                        if entry.strip():
-                            all_entries.add(entry.strip())
+            # Nothing changed since ads.txt was last written
+            if sources == self._ads_txt_sources and os.path.exists(self.global_ads_txt):
+                return {
+                    "success": True,
+                    "message": f"Global ads.txt is up to date with {self._ads_txt_count} entries",
+                    "entries_count": self._ads_txt_count
+                }
             
-            # Write global ads.txt
-            with open(self.global_ads_txt, 'w', encoding='utf-8') as f:
-                f.write("# ads.txt - Auto-generated by AdSense Manager\n")
-                f.write(f"# Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            # Collect ads.txt entries from all domains, re-reading only changed files
+            known_entries = self._ads_txt_entries
+            domain_entries = {}
+            for domain, path, signature in config_files:
+                known = known_entries.get(path)
+                if known and known[0] == signature:
+                    domain_entries[path] = known
+                    continue
                 
-                for entry in sorted(all_entries):
-                    f.write(f"{entry}\n")
+                config, _ = self._load_config(domain, path, signature)
+                entries = frozenset(
+                    entry.strip() for entry in config.get('ads_txt_entries', []) if entry.strip()
+                )
+                domain_entries[path] = (signature, entries)
+            
+            self._ads_txt_entries = domain_entries
+            all_entries = set().union(*(entries for _, entries in domain_entries.values()))
+            
+            # Write global ads.txt in a single call
+            header = (
+                "# ads.txt - Auto-generated by AdSense Manager\n"
+                f"# Updated: {now_iso().replace('T', ' ')}\n\n"
+            )
+            body = "".join(f"{entry}\n" for entry in sorted(all_entries))
+            with open(self.global_ads_txt, 'w', encoding='utf-8') as f:
+                f.write(header + body)
+            
+            self._ads_txt_sources = sources
+            self._ads_txt_count = len(all_entries)
+            self._save_ads_txt_index()
             
             return {
                 "success": True,
@@ -214,23 +410,25 @@ class AdSenseManager:
         if not ad_unit_id:
             return False
         
-        # Basic validation for AdSense ad unit ID
-        return len(ad_unit_id) >= 10 and ad_unit_id.isdigit()
+        # Ad unit IDs are at least 10 digits
+        return _UNIT_RE.fullmatch(ad_unit_id) is not None
     
     def validate_publisher_id(self, publisher_id: str) -> bool:
         """Validate AdSense publisher ID format"""
         if not publisher_id:
             return False
         
-        # Should start with ca-pub-
-        return publisher_id.startswith('ca-pub-') and len(publisher_id) > 7
+        # ca-pub- followed by the numeric account ID
+        return _PUB_RE.fullmatch(publisher_id) is not None
     
     def get_adsense_stats(self, domain: str) -> Dict:
         """Get AdSense statistics for a domain"""
-        config = self.get_domain_adsense_config(domain)
-        
-        enabled_widgets = sum(1 for widget in config['widgets'].values() if widget.get('enabled', False))
-        total_widgets = len(config['widgets'])
+        return self._adsense_stats(*self._domain_config(domain))
+    
+    def _adsense_stats(self, config: Dict, table: _WidgetTable) -> Dict:
+        """Summarize a loaded AdSense configuration"""
+        enabled_widgets = sum(table.enabled)
+        total_widgets = len(table.ids)
         
         return {
             "adsense_enabled": config.get('adsense_enabled', False),
@@ -243,32 +441,37 @@ class AdSenseManager:
     
     def export_domain_ads(self, domain: str) -> str:
         """Export all ad codes for a domain"""
-        config = self.get_domain_adsense_config(domain)
+        config, table = self._domain_config(domain)
         
         if not config.get('adsense_enabled', False):
             return "<!-- AdSense not enabled for this domain -->"
         
+        auto_ads_enabled = bool(config.get('auto_ads', {}).get('enabled', False))
+        publisher_id = config.get('publisher_id', '')
+        
+        # Reuse the last export while the settings it was rendered from are unchanged
+        key = (auto_ads_enabled, publisher_id, table)
+        cached = self._export_cache.get(domain)
+        if cached and cached[0] == key:
+            return cached[1]
+        
         codes = []
         
         # Auto Ads
-        if config.get('auto_ads', {}).get('enabled', False):
-            publisher_id = config.get('publisher_id', '')
-            if publisher_id:
-                codes.append(self.generate_auto_ads_code(publisher_id))
+        if auto_ads_enabled and publisher_id:
+            codes.append(self.generate_auto_ads_code(publisher_id))
         
         # Widget codes
-        for widget_id, widget_config in config.get('widgets', {}).items():
-            if widget_config.get('enabled', False):
-                custom_code = widget_config.get('code', '')
+        for widget_id, enabled, ad_unit_id, size, custom_code in zip(*table):
+            if enabled:
                 if custom_code:
                     codes.append(f"\n<!-- {widget_id.replace('_', ' ').title()} -->\n{custom_code}")
-                else:
-                    ad_unit_id = widget_config.get('ad_unit_id', '')
-                    size = widget_config.get('size', '728x90')
-                    if ad_unit_id:
-                        codes.append(self.generate_ad_code(widget_id, ad_unit_id, size))
+                elif ad_unit_id:
+                    codes.append(self.generate_ad_code(widget_id, ad_unit_id, size))
         
-        return '\n'.join(codes)
+        html = '\n'.join(codes)
+        self._export_cache[domain] = (key, html)
+        return html
     
     def get_all_domains_adsense(self) -> List[Dict]:
         """Get AdSense status for all domains"""
@@ -277,13 +480,11 @@ class AdSenseManager:
         if not os.path.exists(self.ads_folder):
             return domains
         
-        for filename in os.listdir(self.ads_folder):
-            if filename.endswith('_adsense.json'):
-                domain = filename.replace('_adsense.json', '')
-                stats = self.get_adsense_stats(domain)
-                domains.append({
-                    "domain": domain,
-                    **stats
-                })
+        for domain, path, signature in self._iter_config_files():
+            stats = self._adsense_stats(*self._load_config(domain, path, signature))
+            domains.append({
+                "domain": domain,
+                **stats
+            })
         
         return domains
\ No newline at end of file
@@ -1,27 +1,146 @@
 import os
+import re
 import json
+import hashlib
 import logging
-from typing import Dict, List, Optional
+import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+import threading
+from array import array
 import requests
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# KEY=value lines of apikey.txt, both sides stripped; lines starting with # are skipped
+_KV_RE = re.compile(r'^[^\S\n]*([^\s#=][^\n=]*?)?[^\S\n]*=[^\S\n]*([^\n]*?)[^\S\n]*$', re.M)
+
+# BING_API_KEY_1, BING_API_KEY_2, BING_API_KEY_3
+_BING_KEY_NAMES = tuple(f'BING_API_KEY_{i}' for i in range(1, 4))
+
+_BING_IMAGES_URL = 'https://api.bing.microsoft.com/v7.0/images/search'
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Recent successful API test results shared by all managers (the app builds a new one
+# per rerun): (service, key digest) -> (time.monotonic() of the test, result).
+# Failures are never cached so a fixed key or recovered network shows up at once.
+_STATUS_CACHE: Dict[tuple, tuple] = {}
+_STATUS_CACHE_LOCK = threading.Lock()
+
+# Parsed Bing image results: (normalized query, count) -> images, most recent last
+_IMAGE_CACHE: OrderedDict = OrderedDict()
+_IMAGE_CACHE_SIZE = 512
+_IMAGE_CACHE_LOCK = threading.Lock()
+
+# Fields of a parsed image record
+_IMAGE_FIELDS = ('url', 'thumbnail_url', 'name', 'width', 'height', 'size', 'format',
+                 'host_url', 'date_published', 'is_family_friendly')
+
+def _normalized_query(query: str) -> str:
+    return query.strip().lower()
+
+def _key_digest(*api_keys: str) -> str:
+    """Cache key for a set of API keys that does not keep the keys themselves"""
+    return hashlib.sha256('\n'.join(api_keys).encode('utf-8')).hexdigest()
+
+def _new_bing_session() -> requests.Session:
+    """Session with pooled keep-alive connections and retries on transient Bing errors"""
+    session = requests.Session()
+    session.headers['User-Agent'] = _USER_AGENT
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False
+    )
+    # Enough pooled connections for search_bing_images_batch's workers
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+    session.mount('https://api.bing.microsoft.com', adapter)
+    session.mount('https://', adapter)
+    return session
 
 class APIManager:
-    def __init__(self):
+    # google.genai, imported on the first Gemini test
+    _genai_module = None
+    # Gemini clients by API key, shared by all managers
+    _gemini_clients: Dict[str, Any] = {}
+    
+    def __init__(self, status_ttl: float = 60):
         self.api_keys = {}
+        # Seconds an API test result is reused before testing again
+        self.status_ttl = status_ttl
+        self._session = _new_bing_session()
+        # apikey.txt has appended updates that compact() has not folded in yet
+        self._apikey_dirty = False
+        # Configured Bing keys in BING_API_KEY_1..3 order, rebuilt when keys change
+        self._bing_keys: tuple = ()
         self.load_api_keys()
+    
+    def close(self):
+        """Compact apikey.txt and release pooled HTTP connections"""
+        self.compact()
+        self._session.close()
+    
+    def compact(self):
+        """Fold keys appended by update_api_key back into a single line each
+        
+        Each key keeps the position of its first line, set to the value of its last
+        line in the file (the value load_api_keys sees); later duplicates are dropped.
+        Comments and other lines are left as they are. The file is replaced atomically.
+        """
+        if not self._apikey_dirty:
+            return
+        
+        try:
+            file_path = Path("apikey.txt")
+            text = file_path.read_text(encoding='utf-8')
+            lines = text.splitlines(keepends=True)
+            
+            # Current value of every key, later lines overriding earlier ones
+            entries = _KV_RE.findall(text)
+            values = dict(entries)
+            duplicated = {key for key, count in Counter(key for key, _ in entries).items() if count > 1}
+            
+            compacted = []
+            seen = set()
+            for line in lines:
+                match = _KV_RE.fullmatch(line.rstrip('\r\n'))
+                if match:
+                    key = match.group(1) or ''
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if key in duplicated:
+                        line = f'{key}={values[key]}\n'
+                compacted.append(line)
+            
+            tmp_path = file_path.with_name(file_path.name + '.tmp')
+            tmp_path.write_text(''.join(compacted), encoding='utf-8')
+            os.replace(tmp_path, file_path)
+            self._apikey_dirty = False
+            
+        except Exception as e:
+            logging.error(f"Error compacting API keys: {str(e)}")
         
     def load_api_keys(self):
         """Load API keys from apikey.txt file"""
         try:
             api_file = Path("apikey.txt")
             if api_file.exists():
-                with open(api_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            self.api_keys[key.strip()] = value.strip()
-                            
+                # Later lines override earlier ones for the same key
+                self.api_keys.update(_KV_RE.findall(api_file.read_text()))
+                self._refresh_bing_keys()
+                
                 logging.info(f"Loaded {len(self.api_keys)} API keys from apikey.txt")
             else:
                 logging.warning("apikey.txt not found. Creating template file.")
@@ -68,56 +187,91 @@ CLOUDFLARE_API_KEY=your_cloudflare_api_key_here
         
     def get_bing_api_keys(self) -> List[str]:
         """Get all Bing API keys"""
-        keys = []
-        for i in range(1, 4):  # BING_API_KEY_1, BING_API_KEY_2, BING_API_KEY_3
-            key = self.get_api_key(f'BING_API_KEY_{i}')
-            if key:
-                keys.append(key)
-        return keys
+        return list(self._bing_keys)
+    
+    def _refresh_bing_keys(self):
+        """Rebuild the cached Bing key tuple from api_keys"""
+        keys = (self.get_api_key(name) for name in _BING_KEY_NAMES)
+        self._bing_keys = tuple(key for key in keys if key)
         
     def update_api_key(self, service_name: str, api_key: str) -> bool:
         """Update API key for a service"""
         try:
             self.api_keys[service_name] = api_key
             
-            # Update the file
-            lines = []
-            file_path = Path("apikey.txt")
-            
-            if file_path.exists():
-                with open(file_path, 'r') as f:
-                    lines = f.readlines()
+            # Results tested against the old key no longer apply
+            if service_name == 'GEMINI_API_KEY':
+                self._invalidate_status('gemini')
+                APIManager._gemini_clients.clear()
+            elif service_name.startswith('BING_API_KEY_'):
+                self._invalidate_status('bing')
+                self._refresh_bing_keys()
             
-            # Update or add the key
-            updated = False
-            for i, line in enumerate(lines):
-                if line.strip().startswith(f'{service_name}='):
-                    lines[i] = f'{service_name}={api_key}\n'
-                    updated = True
-                    break
+            # Append to the file; the last occurrence of a key wins on load and
+            # compact(), called by the settings page, folds the duplicates back into place
+            entry = f'{service_name}={api_key}\n'.encode('utf-8')
+            fd = os.open("apikey.txt", os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # Keep the new entry off a last line that has no newline
+                if os.fstat(fd).st_size:
+                    os.lseek(fd, -1, os.SEEK_END)
+                    if os.read(fd, 1) != b'\n':
+                        entry = b'\n' + entry
+                os.write(fd, entry)
+            finally:
+                os.close(fd)
             
-            if not updated:
-                lines.append(f'{service_name}={api_key}\n')
-            
-            with open(file_path, 'w') as f:
-                f.writelines(lines)
-                
+            self._apikey_dirty = True
             return True
             
         except Exception as e:
             logging.error(f"Error updating API key: {str(e)}")
             return False
             
+    def _invalidate_status(self, service: str):
+        """Drop cached test results for a service"""
+        with _STATUS_CACHE_LOCK:
+            for cache_key in [k for k in _STATUS_CACHE if k[0] == service]:
+                del _STATUS_CACHE[cache_key]
+    
+    def _cached_status(self, service: str, digest: str) -> Optional[Dict]:
+        """Result of a recent successful test of these keys, if still within status_ttl"""
+        with _STATUS_CACHE_LOCK:
+            cached = _STATUS_CACHE.get((service, digest))
+        if cached and time.monotonic() - cached[0] < self.status_ttl:
+            return cached[1]
+        return None
+    
+    def _store_status(self, service: str, digest: str, result: Dict):
+        """Remember a test result for status_ttl if the test succeeded"""
+        if result.get('success'):
+            with _STATUS_CACHE_LOCK:
+                _STATUS_CACHE[(service, digest)] = (time.monotonic(), result)
+    
     def test_gemini_api(self) -> Dict:
         """Test Gemini API connection"""
+        api_key = self.get_api_key('GEMINI_API_KEY')
+        if not api_key:
+            return {'success': False, 'error': 'Gemini API key not found'}
+        
+        digest = _key_digest(api_key)
+        result = self._cached_status('gemini', digest)
+        if result is None:
+            result = self._test_gemini_api(api_key)
+            self._store_status('gemini', digest, result)
+        return result
+    
+    def _test_gemini_api(self, api_key: str) -> Dict:
+        """Send a test request to Gemini"""
         try:
-            api_key = self.get_api_key('GEMINI_API_KEY')
-            if not api_key:
-                return {'success': False, 'error': 'Gemini API key not found'}
-            
-            # Simple test request
-            from google import genai
-            client = genai.Client(api_key=api_key)
+            # Simple test request; the SDK is imported and the client built once
+            client = APIManager._gemini_clients.get(api_key)
+            if client is None:
+                if APIManager._genai_module is None:
+                    from google import genai
+                    APIManager._genai_module = genai
+                client = APIManager._genai_module.Client(api_key=api_key)
+                APIManager._gemini_clients[api_key] = client
             
             response = client.models.generate_content(
                 model="gemini-2.5-flash",
@@ -134,17 +288,25 @@ CLOUDFLARE_API_KEY=your_cloudflare_api_key_here
             
     def test_bing_api(self) -> Dict:
         """Test Bing Image Search API connection"""
+        api_keys = self.get_bing_api_keys()
+        if not api_keys:
+            return {'success': False, 'error': 'No Bing API keys found'}
+        
+        digest = _key_digest(*api_keys)
+        result = self._cached_status('bing', digest)
+        if result is None:
+            result = self._test_bing_api(api_keys)
+            self._store_status('bing', digest, result)
+        return result
+    
+    def _test_bing_api(self, api_keys: List[str]) -> Dict:
+        """Send a test request with the first Bing key"""
         try:
-            api_keys = self.get_bing_api_keys()
-            if not api_keys:
-                return {'success': False, 'error': 'No Bing API keys found'}
-            
             # Test first API key
             api_key = api_keys[0]
             
             headers = {
-                'Ocp-Apim-Subscription-Key': api_key,
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                'Ocp-Apim-Subscription-Key': api_key
             }
             
             params = {
@@ -153,8 +315,8 @@ CLOUDFLARE_API_KEY=your_cloudflare_api_key_here
                 'safeSearch': 'Moderate'
             }
             
-            response = requests.get(
-                'https://api.bing.microsoft.com/v7.0/images/search',
+            response = self._session.get(
+                _BING_IMAGES_URL,
                 headers=headers,
                 params=params,
                 timeout=10
@@ -168,35 +330,88 @@ CLOUDFLARE_API_KEY=your_cloudflare_api_key_here
         except Exception as e:
             return {'success': False, 'error': f'Bing API test failed: {str(e)}'}
             
-    def get_api_status(self) -> Dict:
-        """Get status of all APIs"""
-        status = {
-            'gemini': self.test_gemini_api(),
-            'bing': self.test_bing_api(),
-            'total_keys': len(self.api_keys),
-            'available_keys': []
-        }
-        
-        for key, value in self.api_keys.items():
-            if value and not value.startswith('your_'):
-                status['available_keys'].append(key)
-                
-        return status
+    def get_api_status(self) -> Mapping[str, Any]:
+        """Get status of all APIs as a read-only mapping. The test results are
+        shared with the status cache, so they are wrapped read-only as well."""
+        api_keys = self.api_keys
+        return MappingProxyType({
+            'gemini': MappingProxyType(self.test_gemini_api()),
+            'bing': MappingProxyType(self.test_bing_api()),
+            'total_keys': len(api_keys),
+            'available_keys': tuple(
+                key for key, value in api_keys.items()
+                if value and not value.startswith('your_')
+            )
+        })
         
     def search_bing_images_json(self, query: str, count: int = 10) -> List[Dict]:
         """Search Bing images using JSON query system"""
+        api_keys = self.get_bing_api_keys()
+        if not api_keys:
+            return []
+        
+        # Use first available API key
+        return self._search_bing_images(query, count, api_keys[0])
+    
+    def search_bing_images_batch(self, queries: List[str], count: int = 10) -> Dict[str, List[Dict]]:
+        """Search Bing images for several queries concurrently over the shared session"""
+        api_keys = self.get_bing_api_keys()
+        queries = list(dict.fromkeys(queries))
+        if not api_keys or not queries:
+            return {query: [] for query in queries}
+        
+        # Spread the queries over the available keys round-robin
+        with ThreadPoolExecutor(max_workers=min(8, len(queries))) as executor:
+            futures = {
+                query: executor.submit(self._search_bing_images, query, count, api_keys[i % len(api_keys)])
+                for i, query in enumerate(queries)
+            }
+            return {query: future.result() for query, future in futures.items()}
+    
+    def search_bing_images_soa(self, query: str, count: int = 10) -> Dict[str, Any]:
+        """Same results as search_bing_images_json as one column per field
+        
+        String fields are lists and the pixel sizes are array('I') columns, all
+        aligned by position; handy when a caller only needs e.g. the URLs.
+        """
+        images = self.search_bing_images_json(query, count)
+        columns = {field: [image[field] for image in images] for field in _IMAGE_FIELDS}
+        for field in ('width', 'height'):
+            columns[field] = array('I', (int(value or 0) for value in columns[field]))
+        return columns
+    
+    def clear_image_cache(self):
+        """Forget cached Bing image results"""
+        with _IMAGE_CACHE_LOCK:
+            _IMAGE_CACHE.clear()
+    
+    def _search_bing_images(self, query: str, count: int, api_key: str) -> List[Dict]:
+        """Run one Bing image search with the given key, reusing cached results"""
+        cache_key = (_normalized_query(query), min(count, 150))
+        with _IMAGE_CACHE_LOCK:
+            images = _IMAGE_CACHE.get(cache_key)
+            if images is not None:
+                _IMAGE_CACHE.move_to_end(cache_key)
+        
+        if images is None:
+            images = self._fetch_bing_images(query, count, api_key)
+            # Failed or empty searches are retried next time
+            if not images:
+                return images
+            with _IMAGE_CACHE_LOCK:
+                _IMAGE_CACHE[cache_key] = images
+                if len(_IMAGE_CACHE) > _IMAGE_CACHE_SIZE:
+                    _IMAGE_CACHE.popitem(last=False)
+        
+        # Callers get their own records to modify
+        return [dict(image) for image in images]
+    
+    def _fetch_bing_images(self, query: str, count: int, api_key: str) -> List[Dict]:
+        """Request and parse one Bing image search"""
         try:
-            api_keys = self.get_bing_api_keys()
-            if not api_keys:
-                return []
-            
-            # Use first available API key
-            api_key = api_keys[0]
-            
             headers = {
                 'Ocp-Apim-Subscription-Key': api_key,
-                'Content-Type': 'application/json',
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                'Content-Type': 'application/json'
             }
             
             # JSON query parameters
@@ -210,15 +425,16 @@ CLOUDFLARE_API_KEY=your_cloudflare_api_key_here
                 'aspect': 'Wide'
             }
             
-            response = requests.get(
-                'https://api.bing.microsoft.com/v7.0/images/search',
+            response = self._session.get(
+                _BING_IMAGES_URL,
                 headers=headers,
                 params=search_params,
                 timeout=15
             )
             
             if response.status_code == 200:
-                data = response.json()
+                # Parse the raw body directly (orjson when installed)
+                data = _loads(response.content)
                 images = []
                 
                 for item in data.get('value', []):
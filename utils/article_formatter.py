@@ -1,5 +1,94 @@
+import io
 import re
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, Iterator, List
+
+# A line starting with any of the bullet_patterns
+_BULLET_RE = re.compile(r'^(?:\d+\.|[-*•])\s+')
+# Escapes text interpolated into the generated HTML in a single pass
+_HTML_TRANS = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+# Paragraphs ending in these are sentences, not headings
+_SENTENCE_ENDINGS = ('.', '!', '?')
+# Comparison keywords (matched anywhere, as substrings) that suggest a two-column layout
+_COLUMN_KEYWORDS_RE = re.compile(
+    r'vs|compared to|advantages|disadvantages|pros|cons|benefits|drawbacks',
+    re.IGNORECASE
+)
+# First characters of the non-numbered bullets
+_BULLET_FIRST = frozenset('-*•')
+# The bullet_patterns stripped one after another, in order
+_BULLET_STRIP_RE = re.compile(r'^(?:\d+\.\s+)?(?:-\s+)?(?:\*\s+)?(?:•\s+)?')
+
+def _iter_paragraphs(content: str) -> Iterator[str]:
+    """Yield the same pieces as content.split('\\n\\n') without building the list"""
+    find = content.find
+    start = 0
+    while True:
+        end = find('\n\n', start)
+        if end < 0:
+            yield content[start:]
+            return
+        yield content[start:end]
+        start = end + 2
+
+# Longer contents are formatted directly rather than kept in the caches
+_CACHE_MAX_CHARS = 64_000
+
+_ARTICLE_STYLES = """
+        <style>
+        .formatted-list {
+            margin: 20px 0;
+            padding-left: 20px;
+        }
+        
+        .formatted-list li {
+            margin: 8px 0;
+            line-height: 1.6;
+            padding: 5px 0;
+            border-left: 3px solid #007bff;
+            padding-left: 15px;
+            margin-left: 10px;
+        }
+        
+        .two-column-layout {
+            display: grid;
+            grid-template-columns: 1fr 1fr;
+            gap: 30px;
+            margin: 20px 0;
+        }
+        
+        .column-left, .column-right {
+            padding: 15px;
+            background: #f8f9fa;
+            border-radius: 8px;
+            border-left: 4px solid #007bff;
+        }
+        
+        .article-content {
+            max-width: 800px;
+            margin: 0 auto;
+            line-height: 1.7;
+            font-size: 16px;
+        }
+        
+        .article-content h1, .article-content h2, .article-content h3 {
+            color: #2c3e50;
+            margin-top: 30px;
+            margin-bottom: 15px;
+        }
+        
+        .article-content p {
+            margin-bottom: 15px;
+            text-align: justify;
+        }
+        
+        @media (max-width: 768px) {
+            .two-column-layout {
+                grid-template-columns: 1fr;
+            }
+        }
+        </style>
+        """
 
 class ArticleFormatter:
     def __init__(self):
@@ -21,71 +110,90 @@ class ArticleFormatter:
     
     def format_html_content(self, content: str) -> str:
         """Format content as HTML with bullet points and columns"""
-        # Split content into paragraphs
-        paragraphs = content.split('\n\n')
-        formatted_paragraphs = []
+        if len(content) < _CACHE_MAX_CHARS:
+            return _format_html_cached(content)
+        return self._format_html_content(content)
+    
+    def _format_html_content(self, content: str) -> str:
+        """Uncached format_html_content"""
+        buffer = io.StringIO()
+        write = buffer.write
+        separator = ''
         
-        for paragraph in paragraphs:
+        # Walk the paragraphs, writing each one as it is formatted
+        for paragraph in _iter_paragraphs(content):
+            write(separator)
+            separator = '\n\n'
             if self.is_list_paragraph(paragraph):
-                formatted_paragraphs.append(self.format_list_html(paragraph))
+                write(self.format_list_html(paragraph))
             elif self.should_be_columns(paragraph):
-                formatted_paragraphs.append(self.format_columns_html(paragraph))
+                write(self.format_columns_html(paragraph))
             else:
-                formatted_paragraphs.append(f"<p>{paragraph}</p>")
+                write(f"<p>{paragraph.translate(_HTML_TRANS)}</p>")
         
-        return '\n\n'.join(formatted_paragraphs)
+        return buffer.getvalue()
     
     def format_markdown_content(self, content: str) -> str:
         """Format content as Markdown with proper bullet points"""
-        paragraphs = content.split('\n\n')
-        formatted_paragraphs = []
+        if len(content) < _CACHE_MAX_CHARS:
+            return _format_markdown_cached(content)
+        return self._format_markdown_content(content)
+    
+    def _format_markdown_content(self, content: str) -> str:
+        """Uncached format_markdown_content"""
+        buffer = io.StringIO()
+        write = buffer.write
+        separator = ''
         
-        for paragraph in paragraphs:
+        for paragraph in _iter_paragraphs(content):
+            write(separator)
+            separator = '\n\n'
             if self.is_list_paragraph(paragraph):
-                formatted_paragraphs.append(self.format_list_markdown(paragraph))
+                write(self.format_list_markdown(paragraph))
             else:
-                formatted_paragraphs.append(paragraph)
+                write(paragraph)
         
-        return '\n\n'.join(formatted_paragraphs)
+        return buffer.getvalue()
     
     def is_list_paragraph(self, paragraph: str) -> bool:
         """Check if paragraph should be formatted as a list"""
-        lines = paragraph.split('\n')
         list_lines = 0
         
-        for line in lines:
+        for line in paragraph.split('\n'):
             line = line.strip()
-            if any(re.match(pattern, line) for pattern in self.bullet_patterns):
-                list_lines += 1
+            first = line[:1]
+            # Symbol bullets only need a whitespace check; numbered ones go to the regex
+            if first in _BULLET_FIRST:
+                if not line[1:2].isspace():
+                    continue
+            elif not (first.isdigit() and _BULLET_RE.match(line)):
+                continue
+            
+            list_lines += 1
+            if list_lines > 1:  # At least 2 lines should be list items
+                return True
         
-        return list_lines > 1  # At least 2 lines should be list items
+        return False
     
     def should_be_columns(self, paragraph: str) -> bool:
         """Check if paragraph should be formatted in columns"""
         # Check for comparison content, benefits/drawbacks, etc.
-        keywords = ['vs', 'compared to', 'advantages', 'disadvantages', 'pros', 'cons', 'benefits', 'drawbacks']
-        return any(keyword in paragraph.lower() for keyword in keywords)
+        return _COLUMN_KEYWORDS_RE.search(paragraph) is not None
     
     def format_list_html(self, paragraph: str) -> str:
         """Format paragraph as HTML list"""
-        lines = paragraph.split('\n')
-        list_items = []
-        
-        for line in lines:
-            line = line.strip()
-            if line:
-                # Remove bullet patterns and add as list item
-                cleaned_line = line
-                for pattern in self.bullet_patterns:
-                    cleaned_line = re.sub(pattern, '', cleaned_line)
-                
-                if cleaned_line:
-                    list_items.append(f"<li>{cleaned_line}</li>")
+        # Remove bullet patterns and add each non-empty line as a list item
+        strip_bullet = _BULLET_STRIP_RE.sub
+        list_items = ''.join(
+            f"<li>{cleaned_line.translate(_HTML_TRANS)}</li>"
+            for cleaned_line in (strip_bullet('', line.strip(), count=1) for line in paragraph.split('\n'))
+            if cleaned_line
+        )
         
         if list_items:
-            return f"<ul class='formatted-list'>\n{''.join(list_items)}\n</ul>"
+            return f"<ul class='formatted-list'>\n{list_items}\n</ul>"
         else:
-            return f"<p>{paragraph}</p>"
+            return f"<p>{paragraph.translate(_HTML_TRANS)}</p>"
     
     def format_list_markdown(self, paragraph: str) -> str:
         """Format paragraph as Markdown list"""
@@ -96,9 +204,7 @@ class ArticleFormatter:
             line = line.strip()
             if line:
                 # Ensure consistent bullet formatting
-                cleaned_line = line
-                for pattern in self.bullet_patterns:
-                    cleaned_line = re.sub(pattern, '', cleaned_line)
+                cleaned_line = _BULLET_STRIP_RE.sub('', line, count=1)
                 
                 if cleaned_line:
                     list_items.append(f"- {cleaned_line}")
@@ -107,89 +213,39 @@ class ArticleFormatter:
     
     def format_columns_html(self, paragraph: str) -> str:
         """Format paragraph content in columns"""
-        # Split content that can be displayed in columns
-        sentences = paragraph.split('. ')
+        # Split content that can be displayed in columns: with at least 4
+        # sentences, break at the separator before the middle sentence
+        separators = paragraph.count('. ')
         
-        if len(sentences) >= 4:
-            mid_point = len(sentences) // 2
-            col1 = '. '.join(sentences[:mid_point])
-            col2 = '. '.join(sentences[mid_point:])
+        if separators >= 3:
+            split_at = -2
+            for _ in range((separators + 1) // 2):
+                split_at = paragraph.find('. ', split_at + 2)
+            col1 = paragraph[:split_at]
+            col2 = paragraph[split_at + 2:]
             
             return f"""
             <div class='two-column-layout'>
                 <div class='column-left'>
-                    <p>{col1}</p>
+                    <p>{col1.translate(_HTML_TRANS)}</p>
                 </div>
                 <div class='column-right'>
-                    <p>{col2}</p>
+                    <p>{col2.translate(_HTML_TRANS)}</p>
                 </div>
             </div>
             """
         else:
-            return f"<p>{paragraph}</p>"
+            return f"<p>{paragraph.translate(_HTML_TRANS)}</p>"
     
     def add_article_styles(self) -> str:
         """Return CSS styles for formatted articles"""
-        return """
-        <style>
-        .formatted-list {
-            margin: 20px 0;
-            padding-left: 20px;
-        }
-        
-        .formatted-list li {
-            margin: 8px 0;
-            line-height: 1.6;
-            padding: 5px 0;
-            border-left: 3px solid #007bff;
-            padding-left: 15px;
-            margin-left: 10px;
-        }
-        
-        .two-column-layout {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-            margin: 20px 0;
-        }
-        
-        .column-left, .column-right {
-            padding: 15px;
-            background: #f8f9fa;
-            border-radius: 8px;
-            border-left: 4px solid #007bff;
-        }
-        
-        .article-content {
-            max-width: 800px;
-            margin: 0 auto;
-            line-height: 1.7;
-            font-size: 16px;
-        }
-        
-        .article-content h1, .article-content h2, .article-content h3 {
-            color: #2c3e50;
-            margin-top: 30px;
-            margin-bottom: 15px;
-        }
-        
-        .article-content p {
-            margin-bottom: 15px;
-            text-align: justify;
-        }
-        
-        @media (max-width: 768px) {
-            .two-column-layout {
-                grid-template-columns: 1fr;
-            }
-        }
-        </style>
-        """
+        return _ARTICLE_STYLES
     
     def generate_article_structure(self, title: str, content: str, category: str) -> Dict:
         """Generate structured article with proper formatting"""
         # Split content into sections
         sections = self.split_into_sections(content)
+        word_count = len(content.split())
         
         # Format each section
         formatted_sections = []
@@ -206,34 +262,32 @@ class ArticleFormatter:
             'category': category,
             'sections': formatted_sections,
             'formatted_html': self.compile_full_article(title, formatted_sections),
-            'word_count': len(content.split()),
-            'reading_time': self.calculate_reading_time(content)
+            'word_count': word_count,
+            'reading_time': self.reading_time_from_word_count(word_count)
         }
     
     def split_into_sections(self, content: str) -> List[Dict]:
         """Split content into logical sections"""
         # Simple section splitting based on headings
         sections = []
-        current_section = {'heading': '', 'content': '', 'type': 'text'}
+        heading = ''
+        # Paragraphs of the current section, joined once the section ends
+        parts = []
         
-        paragraphs = content.split('\n\n')
-        
-        for paragraph in paragraphs:
+        for paragraph in _iter_paragraphs(content):
             # Check if paragraph is a heading
             if self.is_heading(paragraph):
-                if current_section['content']:
-                    sections.append(current_section)
-                current_section = {
-                    'heading': paragraph,
-                    'content': '',
-                    'type': 'text'
-                }
+                if parts:
+                    sections.append({'heading': heading, 'content': ''.join(parts), 'type': 'text'})
+                heading = paragraph
+                parts = []
             else:
-                current_section['content'] += paragraph + '\n\n'
+                parts.append(paragraph)
+                parts.append('\n\n')
         
         # Add final section
-        if current_section['content']:
-            sections.append(current_section)
+        if parts:
+            sections.append({'heading': heading, 'content': ''.join(parts), 'type': 'text'})
         
         return sections
     
@@ -241,28 +295,44 @@ class ArticleFormatter:
         """Check if paragraph is a heading"""
         # Simple heuristic: short lines that don't end with period
         return (len(paragraph) < 100 and 
-                not paragraph.endswith('.') and 
-                not paragraph.endswith('!') and 
-                not paragraph.endswith('?') and
-                len(paragraph.split()) < 10)
+                not paragraph.endswith(_SENTENCE_ENDINGS) and
+                len(paragraph.split(None, 9)) < 10)
     
     def compile_full_article(self, title: str, sections: List[Dict]) -> str:
         """Compile full article HTML"""
-        html = f"""
+        parts = [f"""
         <div class='article-content'>
-            <h1>{title}</h1>
-        """
+            <h1>{title.translate(_HTML_TRANS)}</h1>
+        """]
+        append = parts.append
         
         for section in sections:
             if section['heading']:
-                html += f"<h2>{section['heading']}</h2>\n"
-            html += section['content'] + "\n"
+                append(f"<h2>{section['heading'].translate(_HTML_TRANS)}</h2>\n")
+            append(section['content'])
+            append("\n")
         
-        html += "</div>"
-        return html
+        append("</div>")
+        return ''.join(parts)
     
     def calculate_reading_time(self, content: str) -> int:
         """Calculate reading time in minutes"""
-        word_count = len(content.split())
+        return self.reading_time_from_word_count(len(content.split()))
+    
+    def reading_time_from_word_count(self, word_count: int) -> int:
+        """Reading time in minutes for a known word count"""
         # Average reading speed: 200 words per minute
-        return max(1, round(word_count / 200))
\ No newline at end of file
+        return max(1, round(word_count / 200))
+
+
+# Formatting is a pure function of the content, so results are shared by all
+# formatters (the app creates a new one on every rerun)
+_SHARED_FORMATTER = ArticleFormatter()
+
+@lru_cache(maxsize=256)
+def _format_html_cached(content: str) -> str:
+    return _SHARED_FORMATTER._format_html_content(content)
+
+@lru_cache(maxsize=256)
+def _format_markdown_cached(content: str) -> str:
+    return _SHARED_FORMATTER._format_markdown_content(content)
@@ -1,4 +1,6 @@
+import os
 import time
+import asyncio
 import json
 import logging
 from typing import Dict, List, Optional
@@ -8,6 +10,153 @@ from utils.gemini_ai import GeminiAI
 from utils.bing_image_scraper import BingImageScraper
 from utils.seo_optimizer import SEOOptimizer
 import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    _loads = orjson.loads
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+# Gemini results reused across domains and reruns, persisted between restarts:
+# json [task, *normalized args] -> [time.time() of generation, result], most recent last.
+# The file is an append-only log of [key, entry] lines (later lines win), rewritten
+# from the in-memory cache once it holds twice as many lines as the cache can.
+_AUTO_CONTENT_DIR = "PanelDomain/auto_content"
+_PROMPT_CACHE_FILE = os.path.join(_AUTO_CONTENT_DIR, "prompt_cache.jsonl")
+_PROMPT_CACHE_SIZE = 1024
+_PROMPT_CACHE_TTL = 24 * 3600
+_PROMPT_CACHE: Optional[OrderedDict] = None
+_PROMPT_CACHE_LOCK = threading.Lock()
+# Serializes writes to the log file; never taken while holding _PROMPT_CACHE_LOCK
+_PROMPT_CACHE_FILE_LOCK = threading.Lock()
+_PROMPT_CACHE_LINES = 0
+# Set when the file holds a torn line, so the next append rewrites it first
+_PROMPT_CACHE_TORN = False
+
+def _prompt_key(task: str, *args: str) -> str:
+    """Cache key that ignores case and whitespace differences in the inputs"""
+    return json.dumps([task, *(' '.join(str(arg).lower().split()) for arg in args)])
+
+def _load_prompt_cache() -> OrderedDict:
+    """Read the persisted cache on first use, dropping expired entries"""
+    global _PROMPT_CACHE, _PROMPT_CACHE_LINES, _PROMPT_CACHE_TORN
+    if _PROMPT_CACHE is None:
+        _PROMPT_CACHE = OrderedDict()
+        cutoff = time.time() - _PROMPT_CACHE_TTL
+        try:
+            with open(_PROMPT_CACHE_FILE, 'r', encoding='utf-8') as f:
+                for line in f:
+                    _PROMPT_CACHE_LINES += 1
+                    try:
+                        key, entry = _loads(line)
+                        fresh = entry[0] > cutoff
+                    except (ValueError, TypeError, IndexError):
+                        # A line cut short by a crash mid-append
+                        _PROMPT_CACHE_TORN = True
+                        continue
+                    _PROMPT_CACHE.pop(key, None)
+                    if fresh:
+                        _PROMPT_CACHE[key] = entry
+            while len(_PROMPT_CACHE) > _PROMPT_CACHE_SIZE:
+                _PROMPT_CACHE.popitem(last=False)
+        except OSError as e:
+            if not isinstance(e, FileNotFoundError):
+                logging.warning(f"Ignoring unreadable prompt cache: {str(e)}")
+    return _PROMPT_CACHE
+
+def _append_prompt_cache(key: str, entry: list):
+    """Append one new entry to the cache file, rewriting the file instead when it has
+    grown well past the cache size or holds a torn line. Called without
+    _PROMPT_CACHE_LOCK held; the new entry is already in the cache."""
+    global _PROMPT_CACHE_LINES, _PROMPT_CACHE_TORN
+    line = _dumps([key, entry]) + '\n'
+    try:
+        with _PROMPT_CACHE_FILE_LOCK:
+            os.makedirs(os.path.dirname(_PROMPT_CACHE_FILE), exist_ok=True)
+            if not _PROMPT_CACHE_TORN:
+                with open(_PROMPT_CACHE_FILE, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                _PROMPT_CACHE_LINES += 1
+                if _PROMPT_CACHE_LINES <= 2 * _PROMPT_CACHE_SIZE:
+                    return
+            
+            # Snapshot under the cache lock, write after releasing it
+            with _PROMPT_CACHE_LOCK:
+                items = list(_PROMPT_CACHE.items())
+            tmp_file = _PROMPT_CACHE_FILE + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(''.join(_dumps(item) + '\n' for item in items))
+            os.replace(tmp_file, _PROMPT_CACHE_FILE)
+            _PROMPT_CACHE_LINES = len(items)
+            _PROMPT_CACHE_TORN = False
+    except OSError as e:
+        logging.warning(f"Could not save prompt cache: {str(e)}")
+
+# robots.txt body; only the sitemap URL and generation time vary
+_ROBOTS_TEMPLATE = """User-agent: *
+Allow: /
+
+# Sitemap location
+Sitemap: %(sitemap_url)s
+
+# Crawl delay (optional)
+Crawl-delay: 1
+
+# Disallow admin pages
+Disallow: /admin/
+Disallow: /private/
+Disallow: /temp/
+
+# Allow specific bot optimizations
+User-agent: Googlebot
+Allow: /
+Crawl-delay: 1
+
+User-agent: Bingbot
+Allow: /
+Crawl-delay: 1
+
+# SEO optimizations
+User-agent: *
+Disallow: /search?
+Disallow: /*?print=1
+Disallow: /*?share=
+Disallow: /wp-admin/
+Disallow: /wp-includes/
+Disallow: /wp-content/plugins/
+Disallow: /wp-content/themes/
+Allow: /wp-content/uploads/
+
+# Generated on %(generated_at)s
+# Auto Website Builder - Optimized for SEO
+"""
+
+# Articles kept in memory per domain; older ones are appended to the domain's overflow file
+_CONTENT_QUEUE_SIZE = 100
+
+# Event loop on one daemon thread that schedules every domain's auto posting
+_SCHEDULER_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+def _scheduler_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared auto-posting loop on first use"""
+    global _SCHEDULER_LOOP
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='auto-posting', daemon=True).start()
+            _SCHEDULER_LOOP = loop
+    return _SCHEDULER_LOOP
+
+def _copy_result(result):
+    """Callers get their own lists so cached results stay unchanged"""
+    return list(result) if isinstance(result, list) else result
 
 class AutoContentManager:
     def __init__(self, api_manager=None):
@@ -16,8 +165,8 @@ class AutoContentManager:
         self.image_scraper = BingImageScraper(api_manager)
         self.seo_optimizer = SEOOptimizer()
         self.auto_posting_active = {}
-        self.posting_threads = {}
-        self.content_queue = {}
+        self.posting_tasks = {}
+        self.content_queue = defaultdict(lambda: deque(maxlen=_CONTENT_QUEUE_SIZE))
         
         # Trending topics and micro-niche categories
         self.trending_topics = [
@@ -72,14 +221,11 @@ class AutoContentManager:
             
             self.auto_posting_active[domain] = True
             
-            # Create posting thread
-            thread = threading.Thread(
-                target=self._auto_posting_worker,
-                args=(domain, settings),
-                daemon=True
+            # Schedule posting on the shared loop
+            self.posting_tasks[domain] = asyncio.run_coroutine_threadsafe(
+                self._auto_posting_worker(domain, settings),
+                _scheduler_loop()
             )
-            thread.start()
-            self.posting_threads[domain] = thread
             
             return {
                 "success": True,
@@ -99,6 +245,11 @@ class AutoContentManager:
             
             self.auto_posting_active[domain] = False
             
+            # Wake the worker from its sleep so it exits now
+            task = self.posting_tasks.get(domain)
+            if task:
+                task.cancel()
+            
             return {
                 "success": True,
                 "message": f"Auto posting stopped for {domain}",
@@ -108,8 +259,9 @@ class AutoContentManager:
         except Exception as e:
             return {"error": f"Failed to stop auto posting: {str(e)}"}
     
-    def _auto_posting_worker(self, domain: str, settings: Dict):
-        """Worker thread for automatic posting"""
+    async def _auto_posting_worker(self, domain: str, settings: Dict):
+        """Worker task for automatic posting"""
+        loop = asyncio.get_running_loop()
         try:
             posting_interval = settings.get('interval_hours', 6)  # Default 6 hours
             max_posts_per_day = settings.get('max_posts_per_day', 4)
@@ -130,22 +282,24 @@ class AutoContentManager:
                     # Check if we've reached daily limit
                     if posts_today >= max_posts_per_day:
                         # Wait until next day
-                        time.sleep(3600)  # Sleep for 1 hour
+                        await asyncio.sleep(3600)  # Sleep for 1 hour
                         continue
                     
-                    # Generate and post content
-                    result = self.generate_auto_content(domain, category, settings)
+                    # Generate and post content; generation blocks, so it runs off the loop
+                    result = await loop.run_in_executor(
+                        None, self.generate_auto_content, domain, category, settings
+                    )
                     
                     if result.get('success'):
                         posts_today += 1
                         logging.info(f"Auto-posted article for {domain}: {result.get('title', 'Unknown')}")
                     
                     # Wait for next posting interval
-                    time.sleep(posting_interval * 3600)  # Convert hours to seconds
+                    await asyncio.sleep(posting_interval * 3600)  # Convert hours to seconds
                     
                 except Exception as e:
                     logging.error(f"Error in auto posting worker for {domain}: {str(e)}")
-                    time.sleep(1800)  # Wait 30 minutes before retrying
+                    await asyncio.sleep(1800)  # Wait 30 minutes before retrying
                     
         except Exception as e:
             logging.error(f"Auto posting worker crashed for {domain}: {str(e)}")
@@ -156,52 +310,44 @@ class AutoContentManager:
             # Get trending keyword
             keyword = self.get_trending_keyword(category)
             
-            # Generate SEO-optimized title
-            titles = self.gemini_ai.generate_article_titles(keyword, count=5)
-            if not titles:
-                return {"error": "Failed to generate titles"}
-            
-            title = titles[0]  # Use the first generated title
-            
-            # Generate keywords
-            keywords = self.gemini_ai.generate_keywords(keyword, count=10)
-            if not keywords:
-                keywords = [keyword]
-            
-            # Generate article content
-            article_data = self.gemini_ai.generate_article_content(
-                title=title,
-                keywords=keywords[:5],  # Use top 5 keywords
-                target_length=settings.get('article_length', 1000)
-            )
-            
-            if 'error' in article_data:
-                return article_data
-            
-            # Get optimized images
-            images = self.image_scraper.get_optimized_images(
-                keyword=keyword,
-                article_content=article_data['content'],
-                count=settings.get('images_per_article', 3)
-            )
-            
-            # Process images with lazy loading and alt text
-            processed_images = []
-            for img in images:
-                alt_text = self.gemini_ai.generate_image_alt_text(
-                    image_context=title,
-                    main_keyword=keyword
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # Keywords only depend on the trending keyword, so generate them alongside the titles
+                keywords_future = executor.submit(
+                    self._cached_generate, 'keywords', (keyword, 10),
+                    lambda: self.gemini_ai.generate_keywords(keyword, count=10)
                 )
                 
-                processed_images.append({
-                    **img,
-                    'alt_text': alt_text,
-                    'lazy_placeholder': self.image_scraper.get_lazy_load_placeholder(),
-                    'optimized': True
-                })
-            
-            # Generate schema markup
-            schema_markup = self.gemini_ai.generate_schema_markup(article_data)
+                # Generate SEO-optimized title; never cached, so every post gets fresh titles
+                titles = self.gemini_ai.generate_article_titles(keyword, count=5)
+                if not titles:
+                    return {"error": "Failed to generate titles"}
+                
+                title = titles[0]  # Use the first generated title
+                
+                keywords = keywords_future.result()
+                if not keywords:
+                    keywords = [keyword]
+                
+                # Generate article content
+                article_data = self.gemini_ai.generate_article_content(
+                    title=title,
+                    keywords=keywords[:5],  # Use top 5 keywords
+                    target_length=settings.get('article_length', 1000)
+                )
+                
+                if 'error' in article_data:
+                    return article_data
+                
+                # Images and schema markup both only need the article, so overlap them
+                images_future = executor.submit(
+                    self._get_processed_images, keyword, title, article_data['content'],
+                    settings.get('images_per_article', 3)
+                )
+                
+                # Generate schema markup
+                schema_markup = self.gemini_ai.generate_schema_markup(article_data)
+                
+                processed_images = images_future.result()
             
             # Create complete article data
             complete_article = {
@@ -219,9 +365,7 @@ class AutoContentManager:
             }
             
             # Add to content queue
-            if domain not in self.content_queue:
-                self.content_queue[domain] = []
-            self.content_queue[domain].append(complete_article)
+            self._enqueue_article(domain, complete_article)
             
             return {
                 'success': True,
@@ -233,6 +377,54 @@ class AutoContentManager:
         except Exception as e:
             return {"error": f"Failed to generate auto content: {str(e)}"}
     
+    def _get_processed_images(self, keyword: str, title: str, content: str, count: int) -> List[Dict]:
+        """Get optimized images for an article with lazy loading and alt text"""
+        images = self.image_scraper.get_optimized_images(
+            keyword=keyword,
+            article_content=content,
+            count=count
+        )
+        
+        # Alt text for all images is generated in one request
+        alt_texts = self._cached_generate(
+            'alt_texts', (title, keyword, len(images)),
+            lambda: self.gemini_ai.generate_image_alt_texts_batch([(title, keyword)] * len(images))
+        )
+        placeholder = self.image_scraper.get_lazy_load_placeholder()
+        return [
+            {
+                **img,
+                'alt_text': alt_text,
+                'lazy_placeholder': placeholder,
+                'optimized': True
+            }
+            for img, alt_text in zip(images, alt_texts)
+        ]
+    
+    def _cached_generate(self, task: str, args: tuple, generate):
+        """Return a recent result for the same task and inputs, or generate and cache one"""
+        key = _prompt_key(task, *args)
+        with _PROMPT_CACHE_LOCK:
+            cache = _load_prompt_cache()
+            entry = cache.get(key)
+            if entry is not None:
+                if time.time() - entry[0] < _PROMPT_CACHE_TTL:
+                    cache.move_to_end(key)
+                    return _copy_result(entry[1])
+                del cache[key]
+        
+        result = generate()
+        # Empty results and fallbacks for failed calls are not worth keeping
+        if result and not (task == 'alt_texts' and any(alt.startswith('Image related to ') for alt in result)):
+            entry = [time.time(), result]
+            with _PROMPT_CACHE_LOCK:
+                cache[key] = entry
+                while len(cache) > _PROMPT_CACHE_SIZE:
+                    cache.popitem(last=False)
+            _append_prompt_cache(key, entry)
+            return _copy_result(result)
+        return result
+    
     def get_trending_keyword(self, category: str) -> str:
         """Get trending keyword based on category"""
         try:
@@ -288,23 +480,32 @@ class AutoContentManager:
             images = article_data.get('images', [])
             replaced_count = 0
             
-            for i, image in enumerate(images):
-                url = image.get('url', '')
+            if images:
+                scraper = self.image_scraper
+                keyword = article_data.get('title', '')
+                urls = [image.get('url', '') for image in images]
                 
-                # Check if image is still available
-                if not self.image_scraper.check_image_availability(url):
-                    # Find replacement
-                    replacement = self.image_scraper.find_replacement_image(
-                        original_keyword=article_data.get('title', ''),
-                        broken_url=url
-                    )
+                with ThreadPoolExecutor(max_workers=min(16, len(urls))) as executor:
+                    # Check which images are still available
+                    statuses = list(executor.map(scraper.check_image_availability, urls))
+                    broken = [i for i, available in enumerate(statuses) if not available]
                     
+                    # Find replacements for the broken ones
+                    replacements = list(executor.map(
+                        lambda i: scraper.find_replacement_image(
+                            original_keyword=keyword,
+                            broken_url=urls[i]
+                        ),
+                        broken
+                    ))
+                
+                for i, replacement in zip(broken, replacements):
                     if replacement:
                         # Update image with replacement
                         images[i] = {
                             **replacement,
-                            'alt_text': image.get('alt_text', ''),
-                            'lazy_placeholder': self.image_scraper.get_lazy_load_placeholder(),
+                            'alt_text': images[i].get('alt_text', ''),
+                            'lazy_placeholder': scraper.get_lazy_load_placeholder(),
                             'replaced': True,
                             'replaced_at': datetime.now().isoformat()
                         }
@@ -330,54 +531,48 @@ class AutoContentManager:
     def generate_robots_txt(self, domain: str, site_settings: Dict) -> str:
         """Generate robots.txt file for the domain"""
         try:
-            sitemap_url = f"https://{domain}/sitemap.xml"
-            
-            robots_content = f"""User-agent: *
-Allow: /
-
-# Sitemap location
-Sitemap: {sitemap_url}
-
-# Crawl delay (optional)
-Crawl-delay: 1
-
-# Disallow admin pages
-Disallow: /admin/
-Disallow: /private/
-Disallow: /temp/
-
-# Allow specific bot optimizations
-User-agent: Googlebot
-Allow: /
-Crawl-delay: 1
-
-User-agent: Bingbot
-Allow: /
-Crawl-delay: 1
-
-# SEO optimizations
-User-agent: *
-Disallow: /search?
-Disallow: /*?print=1
-Disallow: /*?share=
-Disallow: /wp-admin/
-Disallow: /wp-includes/
-Disallow: /wp-content/plugins/
-Disallow: /wp-content/themes/
-Allow: /wp-content/uploads/
-
-# Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-# Auto Website Builder - Optimized for SEO
-"""
+            robots_content = _ROBOTS_TEMPLATE % {
+                'sitemap_url': f"https://{domain}/sitemap.xml",
+                'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
             
             return robots_content
             
         except Exception as e:
             return f"# Error generating robots.txt: {str(e)}"
     
-    def get_content_queue(self, domain: str) -> List[Dict]:
-        """Get content queue for a domain"""
-        return self.content_queue.get(domain, [])
+    def _queue_overflow_file(self, domain: str) -> str:
+        """Get the file holding a domain's articles that no longer fit in memory"""
+        safe_domain = domain.replace(".", "_").replace("/", "_")
+        return os.path.join(_AUTO_CONTENT_DIR, f"{safe_domain}_queue.jsonl")
+    
+    def _enqueue_article(self, domain: str, article: Dict):
+        """Queue an article, moving the oldest one to disk when the queue is full"""
+        queue = self.content_queue[domain]
+        if len(queue) == queue.maxlen:
+            try:
+                # Serialize first so an unserializable article never opens the file
+                line = _dumps(queue[0]) + '\n'
+                os.makedirs(_AUTO_CONTENT_DIR, exist_ok=True)
+                with open(self._queue_overflow_file(domain), 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except (OSError, TypeError, ValueError) as e:
+                logging.error(f"Failed to save overflowing article for {domain}: {str(e)}")
+        queue.append(article)
+    
+    def get_content_queue(self, domain: str, include_overflow: bool = False) -> List[Dict]:
+        """Get content queue for a domain, optionally preceded by the articles moved to disk"""
+        articles = []
+        if include_overflow:
+            try:
+                with open(self._queue_overflow_file(domain), 'r', encoding='utf-8') as f:
+                    articles.extend(_loads(line) for line in f if line.strip())
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logging.error(f"Failed to read queue overflow for {domain}: {str(e)}")
+        articles.extend(self.content_queue.get(domain, ()))
+        return articles
     
     def clear_content_queue(self, domain: str) -> Dict:
         """Clear content queue for a domain"""
@@ -385,6 +580,10 @@ Allow: /wp-content/uploads/
             if domain in self.content_queue:
                 del self.content_queue[domain]
             
+            overflow_file = self._queue_overflow_file(domain)
+            if os.path.exists(overflow_file):
+                os.remove(overflow_file)
+            
             return {
                 'success': True,
                 'message': f'Content queue cleared for {domain}',
@@ -404,7 +603,7 @@ Allow: /wp-content/uploads/
                 'domain': domain,
                 'auto_posting_active': is_active,
                 'queue_length': queue_length,
-                'has_thread': domain in self.posting_threads,
+                'has_thread': domain in self.posting_tasks,
                 'checked_at': datetime.now().isoformat()
             }
             
@@ -1,12 +1,125 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import re
 import json
 import time
-import random
 import logging
+import threading
+from collections import Counter, OrderedDict, defaultdict, deque
+from functools import lru_cache
+from operator import itemgetter
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional
 from urllib.parse import urlparse
 import os
-from datetime import datetime, timedelta
+
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Common words that make poor image search terms
+_STOPWORDS = frozenset([
+    'this', 'that', 'with', 'from', 'they', 'have', 'were', 'will', 'your', 'what',
+    'when', 'where', 'which', 'their', 'would', 'there', 'could', 'other'
+])
+
+# Image extension at the end of a lowercased URL, or an image-related keyword anywhere in it
+_IMAGE_URL_RE = re.compile(r'\.(?:jpe?g|png|gif|webp|bmp)\Z|image|img|photo|pic')
+
+# Token bucket pacing Bing searches across all scrapers (the app builds new ones per
+# rerun): about one search a second, the old per-request pacing, with short bursts
+_BUCKET_RATE = 1.0  # tokens per second
+_BUCKET_BURST = 3.0
+_BUCKET_TOKENS = _BUCKET_BURST
+_BUCKET_LAST = time.monotonic()
+_BUCKET_LOCK = threading.Lock()
+
+# Requests made for one search while Bing keeps answering 429
+_RATE_LIMIT_ATTEMPTS = 3
+
+# Image encodings that get a scoring bonus
+_PREFERRED_FORMATS = frozenset(['jpeg', 'jpg', 'png', 'webp'])
+
+# Search results shared by all scrapers (the app builds new ones per rerun):
+# (query, count, safe_search) -> (time.monotonic() of the search, images), most recent last
+_SEARCH_CACHE: OrderedDict = OrderedDict()
+_SEARCH_CACHE_SIZE = 512
+_SEARCH_CACHE_TTL = 3600
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+# HEAD responses from servers that may still serve the image to a GET
+_HEAD_UNSUPPORTED = frozenset([403, 405, 501])
+
+# Recent availability probes: url -> (time.monotonic() of the probe, available)
+_AVAILABILITY_CACHE: OrderedDict = OrderedDict()
+_AVAILABILITY_CACHE_SIZE = 4096
+_AVAILABILITY_CACHE_TTL = 600
+_AVAILABILITY_CACHE_LOCK = threading.Lock()
+
+def _cache_get(cache: OrderedDict, lock, key, ttl: float):
+    """Cached value for key if it is younger than ttl seconds, else None"""
+    with lock:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= ttl:
+            del cache[key]
+            return None
+        return entry[1]
+
+def _cache_put(cache: OrderedDict, lock, key, value, max_size: int):
+    """Store value under key, evicting the oldest entries past max_size"""
+    with lock:
+        cache[key] = (time.monotonic(), value)
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+def _new_session() -> requests.Session:
+    """Session with pooled keep-alive connections and retries on gateway errors"""
+    session = requests.Session()
+    session.headers['User-Agent'] = _USER_AGENT
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False
+    )
+    # Sized for the concurrent searches and availability probes
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Calls in progress, so concurrent identical calls wait for the first: key -> Future
+_INFLIGHT: Dict[tuple, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+def _singleflight(key: tuple, call):
+    """Run call once for all threads asking for key at the same time"""
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        leader = future is None
+        if leader:
+            future = _INFLIGHT[key] = Future()
+    if not leader:
+        return future.result()
+    
+    try:
+        result = call()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[key]
+
+@lru_cache(maxsize=16)
+def _lazy_load_placeholder(width: int, height: int) -> str:
+    """SVG data URI shown until an image loads; every image of a size shares one string"""
+    return f"data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {width} {height}'%3E%3Crect width='100%25' height='100%25' fill='%23f0f0f0'/%3E%3Ctext x='50%25' y='50%25' text-anchor='middle' dy='0.35em' fill='%23999'%3ELoading...%3C/text%3E%3C/svg%3E"
 
 class BingImageScraper:
     def __init__(self, api_manager=None):
@@ -14,9 +127,14 @@ class BingImageScraper:
         self.api_keys = self._get_api_keys()
         self.current_key_index = 0
         self.base_url = "https://api.bing.microsoft.com/v7.0/images/search"
-        self.request_counts = {}
+        # API key -> time.monotonic() of each request in the last hour, oldest first
+        self.request_counts = defaultdict(deque)
         self.last_request_time = {}
         self.max_requests_per_hour = 1000  # Adjust based on your API limits
+        # Guards key rotation and request bookkeeping across search threads
+        self._lock = threading.RLock()
+        # Shared session so searches and availability probes reuse pooled connections
+        self.session = _new_session()
         
     def _get_api_keys(self):
         """Get API keys from API manager or environment"""
@@ -33,8 +151,9 @@ class BingImageScraper:
     def rotate_api_key(self):
         """Rotate to next API key to avoid rate limits"""
         if len(self.api_keys) > 1:
-            self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-            logging.info(f"Rotated to API key index: {self.current_key_index}")
+            with self._lock:
+                self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
+                logging.info(f"Rotated to API key index: {self.current_key_index}")
     
     def get_current_api_key(self):
         """Get current API key"""
@@ -48,18 +167,16 @@ class BingImageScraper:
         if not current_key:
             return False
             
-        now = datetime.now()
-        hour_ago = now - timedelta(hours=1)
+        hour_ago = time.monotonic() - 3600
         
-        # Clean old requests
-        if current_key in self.request_counts:
-            self.request_counts[current_key] = [
-                req_time for req_time in self.request_counts[current_key] 
-                if req_time > hour_ago
-            ]
-        
-        # Check if we're near the limit
-        request_count = len(self.request_counts.get(current_key, []))
+        with self._lock:
+            # Clean old requests
+            requests_made = self.request_counts[current_key]
+            while requests_made and requests_made[0] <= hour_ago:
+                requests_made.popleft()
+            
+            # Check if we're near the limit
+            request_count = len(requests_made)
         if request_count >= self.max_requests_per_hour - 10:  # Buffer of 10 requests
             return True
         
@@ -69,26 +186,46 @@ class BingImageScraper:
         """Record a request for rate limiting"""
         current_key = self.get_current_api_key()
         if current_key:
-            if current_key not in self.request_counts:
-                self.request_counts[current_key] = []
-            self.request_counts[current_key].append(datetime.now())
+            with self._lock:
+                self.request_counts[current_key].append(time.monotonic())
+    
+    def _acquire(self):
+        """Take a token from the shared request bucket, sleeping until one is available"""
+        global _BUCKET_TOKENS, _BUCKET_LAST
+        with _BUCKET_LOCK:
+            now = time.monotonic()
+            _BUCKET_TOKENS = min(_BUCKET_BURST, _BUCKET_TOKENS + (now - _BUCKET_LAST) * _BUCKET_RATE)
+            _BUCKET_LAST = now
+            # Reserve the token now so concurrent callers queue up behind it
+            _BUCKET_TOKENS -= 1
+            wait = -_BUCKET_TOKENS / _BUCKET_RATE if _BUCKET_TOKENS < 0 else 0
+        if wait:
+            time.sleep(wait)
     
     def search_images(self, query: str, count: int = 10, safe_search: str = "Moderate") -> List[Dict]:
         """Search for images using Bing Image Search API"""
-        try:
-            # Check rate limits and rotate if needed
-            if self.check_rate_limit():
-                self.rotate_api_key()
-            
-            current_key = self.get_current_api_key()
-            if not current_key:
+        cache_key = (query, count, safe_search)
+        images = _cache_get(_SEARCH_CACHE, _SEARCH_CACHE_LOCK, cache_key, _SEARCH_CACHE_TTL)
+        if images is None:
+            # Concurrent identical searches share one request
+            images = _singleflight(('search', cache_key), lambda: self._fetch_and_cache(cache_key))
+            if not images:
                 return []
-            
-            headers = {
-                'Ocp-Apim-Subscription-Key': current_key,
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
+        
+        # Callers get their own records to score and modify
+        return [dict(image) for image in images]
+    
+    def _fetch_and_cache(self, cache_key: tuple) -> List[Dict]:
+        """Run a search and cache its results"""
+        images = self._fetch_images(*cache_key)
+        # Failed or empty searches are retried next time
+        if images:
+            _cache_put(_SEARCH_CACHE, _SEARCH_CACHE_LOCK, cache_key, images, _SEARCH_CACHE_SIZE)
+        return images
+    
+    def _fetch_images(self, query: str, count: int, safe_search: str) -> List[Dict]:
+        """Request and parse one Bing image search"""
+        try:
             params = {
                 'q': query,
                 'count': min(count, 150),  # Bing API limit
@@ -99,16 +236,34 @@ class BingImageScraper:
                 'aspect': 'Wide'
             }
             
-            # Add delay to avoid hitting rate limits
-            time.sleep(random.uniform(0.5, 1.5))
-            
-            response = requests.get(self.base_url, headers=headers, params=params, timeout=10)
+            # Pace searches to about one a second across all scrapers, allowing bursts of three
+            self._acquire()
             
-            if response.status_code == 429:  # Rate limit hit
+            for attempt in range(_RATE_LIMIT_ATTEMPTS):
+                if attempt:
+                    time.sleep(2 ** attempt)  # Back off before retrying with the next key
+                
+                # Check rate limits and rotate if needed
+                with self._lock:
+                    if self.check_rate_limit():
+                        self.rotate_api_key()
+                    
+                    current_key = self.get_current_api_key()
+                if not current_key:
+                    return []
+                
+                headers = {'Ocp-Apim-Subscription-Key': current_key}
+                response = self.session.get(self.base_url, headers=headers, params=params, timeout=10)
+                
+                if response.status_code != 429:
+                    break
+                
+                # Rate limit hit
                 logging.warning("Rate limit hit, rotating API key")
                 self.rotate_api_key()
-                time.sleep(5)  # Wait before retrying
-                return self.search_images(query, count, safe_search)
+            else:
+                logging.error(f"Bing API still rate limited after {_RATE_LIMIT_ATTEMPTS} attempts")
+                return []
             
             if response.status_code != 200:
                 logging.error(f"Bing API error: {response.status_code}")
@@ -154,28 +309,33 @@ class BingImageScraper:
             if not parsed.scheme or not parsed.netloc:
                 return False
             
-            # Check for common image extensions
-            valid_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']
-            if not any(url.lower().endswith(ext) for ext in valid_extensions):
-                # Check if URL has image-related keywords
-                if not any(keyword in url.lower() for keyword in ['image', 'img', 'photo', 'pic']):
-                    return False
-            
-            return True
+            # Require a common image extension or an image-related keyword
+            return _IMAGE_URL_RE.search(url.lower()) is not None
             
         except Exception:
             return False
     
     def get_optimized_images(self, keyword: str, article_content: str, count: int = 5) -> List[Dict]:
         """Get optimized images for article content"""
+        images = _singleflight(
+            ('optimized', keyword, article_content, count),
+            lambda: self._get_optimized_images(keyword, article_content, count)
+        )
+        return [dict(image) for image in images]
+    
+    def _get_optimized_images(self, keyword: str, article_content: str, count: int) -> List[Dict]:
+        """Search, deduplicate and rank images for article content"""
         try:
             # Generate multiple search queries based on content
             search_queries = self.generate_search_queries(keyword, article_content)
             
+            # Limit to 3 queries to avoid API overuse; run them concurrently
+            # and keep results in query order so ranking stays stable
+            search_queries = search_queries[:3]
             all_images = []
-            for query in search_queries[:3]:  # Limit to 3 queries to avoid API overuse
-                images = self.search_images(query, count=count)
-                all_images.extend(images)
+            with ThreadPoolExecutor(max_workers=len(search_queries)) as executor:
+                for images in executor.map(lambda query: self.search_images(query, count=count), search_queries):
+                    all_images.extend(images)
             
             # Remove duplicates and sort by relevance
             unique_images = self.remove_duplicates(all_images)
@@ -203,20 +363,15 @@ class BingImageScraper:
                 f"{keyword} concept"
             ])
             
-            # Extract important words from content
-            words = content.lower().split()
-            important_words = []
-            
-            # Look for nouns and important terms
-            for word in words:
-                if (len(word) > 4 and 
-                    word.isalpha() and 
-                    word not in ['this', 'that', 'with', 'from', 'they', 'have', 'were', 'will', 'your', 'what', 'when', 'where', 'which', 'their', 'would', 'there', 'could', 'other']):
-                    important_words.append(word)
+            # Extract the 5 most frequent important words from content;
+            # ties keep the order in which the words first appear
+            word_counts = Counter(
+                word for word in content.lower().split()
+                if len(word) > 4 and word.isalpha() and word not in _STOPWORDS
+            )
             
             # Add combinations with important words
-            for word in important_words[:5]:  # Limit to avoid too many queries
-                queries.append(f"{keyword} {word}")
+            queries.extend([f"{keyword} {word}" for word, _ in word_counts.most_common(5)])
             
             return queries[:10]  # Limit total queries
             
@@ -240,35 +395,22 @@ class BingImageScraper:
     def score_images(self, images: List[Dict], keyword: str) -> List[Dict]:
         """Score images based on relevance to keyword"""
         try:
+            keyword = keyword.lower()
             for image in images:
-                score = 0
-                
-                # Score based on filename/name
-                name = image.get('name', '').lower()
-                if keyword.lower() in name:
-                    score += 10
-                
-                # Score based on image dimensions (prefer landscape for articles)
+                # Filename/name match, landscape and high-resolution dimensions
+                # (preferred for articles), modern format, family-friendly content
                 width = image.get('width', 0)
                 height = image.get('height', 0)
-                if width > height:  # Landscape
-                    score += 5
-                if width >= 800:  # High resolution
-                    score += 5
-                
-                # Score based on format (prefer modern formats)
-                format_type = image.get('encoding_format', '').lower()
-                if format_type in ['jpeg', 'jpg', 'png', 'webp']:
-                    score += 3
-                
-                # Score based on family-friendly content
-                if image.get('is_family_friendly', True):
-                    score += 2
-                
-                image['relevance_score'] = score
+                image['relevance_score'] = (
+                    (10 if keyword in image.get('name', '').lower() else 0)
+                    + (5 if width > height else 0)
+                    + (5 if width >= 800 else 0)
+                    + (3 if image.get('encoding_format', '').lower() in _PREFERRED_FORMATS else 0)
+                    + (2 if image.get('is_family_friendly', True) else 0)
+                )
             
             # Sort by score
-            return sorted(images, key=lambda x: x.get('relevance_score', 0), reverse=True)
+            return sorted(images, key=itemgetter('relevance_score'), reverse=True)
             
         except Exception as e:
             logging.error(f"Error scoring images: {str(e)}")
@@ -276,14 +418,32 @@ class BingImageScraper:
     
     def check_image_availability(self, url: str) -> bool:
         """Check if image URL is still available"""
-        try:
-            response = requests.head(url, timeout=5)
-            return response.status_code == 200
-        except Exception:
-            return False
+        available = _cache_get(_AVAILABILITY_CACHE, _AVAILABILITY_CACHE_LOCK, url, _AVAILABILITY_CACHE_TTL)
+        if available is None:
+            try:
+                response = self.session.head(url, timeout=5, allow_redirects=True)
+                if response.status_code in _HEAD_UNSUPPORTED:
+                    # Some CDNs refuse HEAD; ask for the first byte instead
+                    response = self.session.get(url, headers={'Range': 'bytes=0-0'}, timeout=5, stream=True)
+                    response.close()
+            except Exception as e:
+                # Timeouts and connection errors may be transient, so they are not cached
+                logging.debug(f"Availability check failed for {url}: {str(e)}")
+                return False
+            available = response.status_code in (200, 206)
+            _cache_put(_AVAILABILITY_CACHE, _AVAILABILITY_CACHE_LOCK, url, available, _AVAILABILITY_CACHE_SIZE)
+        return available
     
     def find_replacement_image(self, original_keyword: str, broken_url: str) -> Optional[Dict]:
         """Find replacement for broken image"""
+        replacement = _singleflight(
+            ('replacement', original_keyword, broken_url),
+            lambda: self._find_replacement_image(original_keyword, broken_url)
+        )
+        return dict(replacement) if replacement else None
+    
+    def _find_replacement_image(self, original_keyword: str, broken_url: str) -> Optional[Dict]:
+        """Search for an available image other than the broken one"""
         try:
             # Search for replacement
             replacement_images = self.search_images(f"{original_keyword} replacement", count=5)
@@ -302,4 +462,4 @@ class BingImageScraper:
     
     def get_lazy_load_placeholder(self, width: int = 800, height: int = 400) -> str:
         """Generate lazy load placeholder image"""
-        return f"data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {width} {height}'%3E%3Crect width='100%25' height='100%25' fill='%23f0f0f0'/%3E%3Ctext x='50%25' y='50%25' text-anchor='middle' dy='0.35em' fill='%23999'%3ELoading...%3C/text%3E%3C/svg%3E"
\ No newline at end of file
+        return _lazy_load_placeholder(width, height)
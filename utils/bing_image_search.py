@@ -6,9 +6,51 @@ import logging
 from typing import Dict, List, Optional
 from urllib.parse import urlparse, urlencode
 import re
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import urllib.request
 import urllib.error
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# lxml (installed with trafilatura) parses result pages much faster than html.parser
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+# Only result links and image tags are read from a result page
+_RESULT_TAGS = SoupStrainer(['a', 'img'])
+
+# Concurrent HEAD requests when validating a page of results
+_VALIDATION_WORKERS = 32
+
+# HEAD verdicts shared by all searchers (the app builds new ones per rerun):
+# url -> (time.monotonic() after which the verdict expires, serves an image), newest last
+_VALIDATED_URLS: OrderedDict = OrderedDict()
+_VALIDATED_URLS_SIZE = 4096
+_VALIDATION_TTL = 600
+_VALIDATED_URLS_LOCK = threading.Lock()
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+def _verdict_ttl(response) -> float:
+    """Seconds to trust a HEAD verdict: the response's max-age if shorter than the default"""
+    cache_control = response.headers.get('cache-control', '').lower()
+    if 'no-store' in cache_control or 'no-cache' in cache_control:
+        return 0
+    max_age = _MAX_AGE_RE.search(cache_control)
+    if max_age:
+        return min(int(max_age.group(1)), _VALIDATION_TTL)
+    return _VALIDATION_TTL
 
 class BingImageSearch:
     def __init__(self):
@@ -20,6 +62,11 @@ class BingImageSearch:
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15'
         ]
+        # Shared session so concurrent searches and validations reuse connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=_VALIDATION_WORKERS, pool_maxsize=_VALIDATION_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
     def get_random_user_agent(self):
         """Get a random user agent"""
@@ -43,14 +90,14 @@ class BingImageSearch:
             # Add random delay to avoid being blocked
             time.sleep(random.uniform(1.0, 3.0))
             
-            response = requests.get(search_url, headers=headers, timeout=10)
+            response = self.session.get(search_url, headers=headers, timeout=10)
             
             if response.status_code != 200:
                 logging.error(f"Bing search failed with status code: {response.status_code}")
                 return []
                 
             # Parse HTML to extract image URLs
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, _HTML_PARSER, parse_only=_RESULT_TAGS)
             images = []
             
             # Find image containers
@@ -61,7 +108,7 @@ class BingImageSearch:
                     # Extract image data from the container
                     m_attr = container.get('m')
                     if m_attr:
-                        img_data = json.loads(m_attr)
+                        img_data = _loads(m_attr)
                         
                         image_info = {
                             'url': img_data.get('murl', ''),
@@ -77,14 +124,16 @@ class BingImageSearch:
                             'source': 'bing_search'
                         }
                         
-                        # Validate image URL
-                        if image_info['url'] and self.validate_image_url(image_info['url']):
+                        if image_info['url']:
                             images.append(image_info)
                             
                 except (json.JSONDecodeError, KeyError) as e:
                     logging.warning(f"Error parsing image data: {e}")
                     continue
             
+            # Keep the images whose URLs validate
+            images = self._filter_valid_images(images)
+            
             # If no images found with first method, try alternative parsing
             if not images:
                 images = self._parse_images_alternative(soup, count)
@@ -121,8 +170,7 @@ class BingImageSearch:
                             'source': 'bing_search_alt'
                         }
                         
-                        if self.validate_image_url(image_info['url']):
-                            images.append(image_info)
+                        images.append(image_info)
                             
                 except (ValueError, TypeError) as e:
                     logging.warning(f"Error parsing alternative image: {e}")
@@ -131,10 +179,27 @@ class BingImageSearch:
         except Exception as e:
             logging.error(f"Error in alternative image parsing: {e}")
             
-        return images
+        return self._filter_valid_images(images)
+    
+    def _filter_valid_images(self, images: List[Dict]) -> List[Dict]:
+        """Keep images whose URLs validate, checking them concurrently"""
+        # The cheap URL checks run first so only plausible URLs cost a request
+        urls = list(dict.fromkeys(
+            image['url'] for image in images if self._looks_like_image_url(image['url'])
+        ))
+        if not urls:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(_VALIDATION_WORKERS, len(urls))) as executor:
+            valid = dict(zip(urls, executor.map(self._is_reachable_image, urls)))
+        return [image for image in images if valid.get(image['url'])]
     
     def validate_image_url(self, url: str) -> bool:
         """Validate if image URL is accessible"""
+        return self._looks_like_image_url(url) and self._is_reachable_image(url)
+    
+    def _looks_like_image_url(self, url: str) -> bool:
+        """Check the URL itself for an http scheme and an image extension or keyword"""
         try:
             if not url or not url.startswith('http'):
                 return False
@@ -147,36 +212,52 @@ class BingImageSearch:
             has_image_ext = any(ext in url_lower for ext in image_extensions)
             has_image_keyword = any(keyword in url_lower for keyword in ['image', 'img', 'photo', 'picture'])
             
-            if not (has_image_ext or has_image_keyword):
-                return False
-                
-            # Make a quick HEAD request to check if URL is accessible
-            headers = {'User-Agent': self.get_random_user_agent()}
-            response = requests.head(url, headers=headers, timeout=5, allow_redirects=True)
+            return has_image_ext or has_image_keyword
             
-            if response.status_code == 200:
-                content_type = response.headers.get('content-type', '').lower()
-                return content_type.startswith('image/')
-                
         except Exception as e:
             logging.debug(f"URL validation failed for {url}: {e}")
             
         return False
     
+    def _is_reachable_image(self, url: str) -> bool:
+        """Check the URL serves an image, reusing a recent verdict when there is one"""
+        with _VALIDATED_URLS_LOCK:
+            cached = _VALIDATED_URLS.get(url)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        
+        try:
+            # Make a quick HEAD request to check if URL is accessible
+            headers = {'User-Agent': self.get_random_user_agent()}
+            response = self.session.head(url, headers=headers, timeout=5, allow_redirects=True)
+        except Exception as e:
+            logging.debug(f"URL validation failed for {url}: {e}")
+            return False
+        
+        is_image = (response.status_code == 200
+                    and response.headers.get('content-type', '').lower().startswith('image/'))
+        ttl = _verdict_ttl(response)
+        if ttl:
+            with _VALIDATED_URLS_LOCK:
+                _VALIDATED_URLS[url] = (time.monotonic() + ttl, is_image)
+                _VALIDATED_URLS.move_to_end(url)
+                while len(_VALIDATED_URLS) > _VALIDATED_URLS_SIZE:
+                    _VALIDATED_URLS.popitem(last=False)
+        return is_image
+    
     def get_optimized_images(self, keyword: str, article_content: str, count: int = 5) -> List[Dict]:
         """Get optimized images for article content"""
         try:
             # Generate search queries based on keyword and content
             search_queries = self.generate_search_queries(keyword, article_content)
             
+            # Limit to 3 queries to avoid overload; run them concurrently, each
+            # after its own random delay, and keep results in query order
+            search_queries = search_queries[:3]
             all_images = []
-            
-            for query in search_queries[:3]:  # Limit to 3 queries to avoid overload
-                images = self.search_images(query, count=count)
-                all_images.extend(images)
-                
-                # Add delay between queries
-                time.sleep(random.uniform(2.0, 4.0))
+            with ThreadPoolExecutor(max_workers=len(search_queries)) as executor:
+                for images in executor.map(lambda query: self.search_images(query, count=count), search_queries):
+                    all_images.extend(images)
             
             # Remove duplicates and score images
             unique_images = self.remove_duplicates(all_images)
@@ -1,12 +1,18 @@
 import os
 import json
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from google import genai
 from google.genai import types
 import random
 import time
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 class GeminiAI:
     def __init__(self, api_manager=None):
         self.api_manager = api_manager
@@ -240,6 +246,46 @@ class GeminiAI:
         except Exception as e:
             return f"Image related to {main_keyword}"
     
+    def generate_image_alt_texts_batch(self, titles_keywords: List[Tuple[str, str]]) -> List[str]:
+        """Generate alt text for several images with one request, one entry per (context, keyword) pair"""
+        if not titles_keywords:
+            return []
+        try:
+            images = [{'context': context, 'keyword': keyword} for context, keyword in titles_keywords]
+            prompt = f"""
+            Generate SEO-optimized alt text for each of the following images:
+            {json.dumps(images, ensure_ascii=False)}
+            
+            Requirements:
+            1. Keep each alt text under 125 characters
+            2. Include the image's keyword naturally
+            3. Be descriptive and helpful for accessibility
+            4. Avoid keyword stuffing
+            5. Give each image a different alt text
+            
+            Return only a JSON array of {len(images)} strings, in the same order as the images.
+            """
+            
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=types.GenerateContentConfig(response_mime_type='application/json')
+            )
+            
+            alt_texts = _loads(response.text)
+            if (isinstance(alt_texts, list) and len(alt_texts) == len(images)
+                    and all(isinstance(alt, str) and alt.strip() for alt in alt_texts)):
+                return [alt.strip() for alt in alt_texts]
+            logging.warning("Unexpected batch alt text response, generating one by one")
+            
+        except Exception as e:
+            logging.warning(f"Batch alt text generation failed, generating one by one: {str(e)}")
+        
+        return [
+            self.generate_image_alt_text(image_context=context, main_keyword=keyword)
+            for context, keyword in titles_keywords
+        ]
+    
     def generate_schema_markup(self, article_data: Dict) -> str:
         """Generate JSON-LD schema markup for articles"""
         try:
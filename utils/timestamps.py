@@ -0,0 +1,16 @@
+import time
+from datetime import datetime
+
+# (second, ISO string) of the last rendered timestamp
+_LAST_TS = (0, '')
+
+def now_iso() -> str:
+    """Current local time as an ISO 8601 string at second resolution.
+    The string is only re-rendered when the wall-clock second changes."""
+    global _LAST_TS
+    second = time.time_ns() // 1_000_000_000
+    last_second, stamp = _LAST_TS
+    if second != last_second:
+        stamp = datetime.fromtimestamp(second).isoformat()
+        _LAST_TS = (second, stamp)
+    return stamp